@@ -56,6 +56,13 @@ def create_app(test_config=None):
     
     # Initialize Celery
     celery.conf.update(app.config)
+
+    # Crawled pages and the Maps session state are kept in the instance folder,
+    # wherever the app is started from
+    from .scrapers.page_cache import PAGE_CACHE
+    from .scrapers import gmaps_session
+    PAGE_CACHE.use_instance_path(app.instance_path)
+    gmaps_session.use_instance_path(app.instance_path)
     
     # Import Blueprints
     from .routes import main_bp
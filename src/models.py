@@ -123,3 +123,19 @@ class OptOut(db.Model):
 
     def __repr__(self):
         return f'<OptOut {self.recipient_email} by User {self.sender_id}>'
+
+
+# --- 6. Domain Resolution Cache ---
+class DomainResolution(db.Model):
+    """Cached result of resolving an email domain to its website, shared by all tasks."""
+    __tablename__ = 'domain_resolutions'
+    id = db.Column(db.Integer, primary_key=True)
+    domain = db.Column(db.String(255), unique=True, nullable=False, index=True)
+
+    # Canonical website URL, or NULL when the domain was unreachable (negative entry).
+    # Text: redirects can end on URLs of any length
+    website_url = db.Column(db.Text, nullable=True)
+    resolved_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+    def __repr__(self):
+        return f'<DomainResolution {self.domain} -> {self.website_url or "unreachable"}>'
@@ -0,0 +1,62 @@
+import asyncio
+import os
+from collections import defaultdict
+from urllib.parse import urlparse
+
+from src.scrapers.browser_pool import run_on_crawler_loop
+from src.scrapers.page_cache import PAGE_CACHE
+from src.scrapers.resource_blocking import CRAWL_BLOCK_POLICY
+from src.scrapers.web_scraper import crawl_site_pooled
+from src.utils.host_health import HOST_HEALTH
+
+
+# Max sites crawled at once, and max sites crawled at once on the same host
+CRAWL_CONCURRENCY = int(os.environ.get("CRAWL_CONCURRENCY", 8))
+CRAWL_PER_HOST = int(os.environ.get("CRAWL_PER_HOST", 1))
+
+
+def _host_key(url):
+    host = urlparse(url).netloc.lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+async def crawl_websites_async(
+    urls, max_pages=10, concurrency=CRAWL_CONCURRENCY, per_host=CRAWL_PER_HOST
+):
+    """
+    Crawls many sites concurrently on the worker's shared browser (launched
+    lazily, only if some page needs rendering), capped globally by
+    `concurrency` and per host by `per_host`. Results keep the order of `urls`.
+    """
+    global_limit = asyncio.Semaphore(concurrency)
+    host_limits = defaultdict(lambda: asyncio.Semaphore(per_host))
+
+    async def run(url):
+        # Take the host slot first so waiting on a busy host does not hold a global slot
+        async with host_limits[_host_key(url)]:
+            async with global_limit:
+                try:
+                    return await crawl_site_pooled(url, max_pages=max_pages)
+                except Exception as e:
+                    print(f"Fatal: Crawl failed for {url}. Error: {e}")
+                    return {"pages": {}, "email": None, "stop_reason": "error"}
+
+    results = await asyncio.gather(*(run(url) for url in urls))
+
+    print(f"[INFO] Resource blocking: {CRAWL_BLOCK_POLICY.stats()}")
+    print(f"[INFO] Page cache: {PAGE_CACHE.stats()}")
+    print(f"[INFO] Host health: {HOST_HEALTH.stats()}")
+    return list(results)
+
+
+def crawl_websites(urls, keywords=None, max_pages=10, concurrency=CRAWL_CONCURRENCY, per_host=CRAWL_PER_HOST):
+    """
+    Synchronous entry point for the services: crawls all `urls` concurrently
+    and returns one {"pages": ..., "email": ...} dict per URL, in order. Runs
+    on the worker's crawler loop and long-lived browser (see browser_pool).
+    """
+    if not urls:
+        return []
+    return run_on_crawler_loop(
+        crawl_websites_async(urls, max_pages=max_pages, concurrency=concurrency, per_host=per_host)
+    )
@@ -0,0 +1,94 @@
+import hashlib
+import os
+import re
+
+
+# Pages whose SimHash differs in at most this many of the 64 bits count as copies
+NEAR_DUPLICATE_MAX_BITS = int(os.environ.get("NEAR_DUPLICATE_MAX_BITS", 3))
+
+# Words per shingle for SimHash
+SHINGLE_SIZE = 3
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_WORD_RE = re.compile(r"\w+")
+
+
+def _hash64(text):
+    # Stable across processes, unlike hash()
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def block_key(block):
+    """Identity of a text block: case and whitespace do not matter."""
+    return _hash64(_WHITESPACE_RE.sub(" ", block).strip().lower())
+
+
+def simhash(text):
+    """64-bit SimHash of a text over its word shingles."""
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < SHINGLE_SIZE:
+        shingles = [" ".join(words)] if words else []
+    else:
+        shingles = (" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1))
+
+    weights = [0] * 64
+    for shingle in shingles:
+        value = _hash64(shingle)
+        for bit in range(64):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count("1")
+
+
+def strip_boilerplate(found_pages, max_bits=NEAR_DUPLICATE_MAX_BITS):
+    """
+    Removes what a site repeats on every page from a crawl's pages dict
+    ({stem: {"url", "text"}}, home first):
+
+    - pages that are near-duplicates (SimHash) of an earlier page are dropped
+    - text blocks (lines) already seen on an earlier page are removed, so the
+      header, menu, footer and address block are kept once, on the first page
+
+    Pages left without any text are dropped. Returns a new dict in the same order.
+    """
+    kept_pages = {}
+    kept_hashes = []
+    seen_blocks = set()
+    chars_before = chars_after = 0
+
+    for stem, page in found_pages.items():
+        text = page["text"]
+        chars_before += len(text)
+
+        fingerprint = simhash(text)
+        duplicate_of = next(
+            (other for other, other_hash in kept_hashes if hamming_distance(fingerprint, other_hash) <= max_bits),
+            None,
+        )
+        if duplicate_of is not None:
+            print(f"  -> Dropping page '{stem}', near-duplicate of '{duplicate_of}'")
+            continue
+
+        blocks = []
+        page_blocks = set()
+        for block in text.split("\n"):
+            key = block_key(block)
+            if not block.strip() or key in seen_blocks:
+                continue
+            page_blocks.add(key)
+            blocks.append(block)
+        seen_blocks |= page_blocks
+
+        stripped = "\n".join(blocks)
+        if not stripped:
+            continue
+        kept_hashes.append((stem, fingerprint))
+        kept_pages[stem] = {**page, "text": stripped}
+        chars_after += len(stripped)
+
+    if chars_before:
+        print(f"  -> Boilerplate removed: {chars_before - chars_after} of {chars_before} characters")
+    return kept_pages
@@ -0,0 +1,238 @@
+import asyncio
+import atexit
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+from playwright.async_api import async_playwright
+
+from src.scrapers.resource_blocking import CRAWL_BLOCK_POLICY
+
+
+# Recycle the browser after this many sites, or when the browser process tree
+# grows past the RSS threshold (in MB). Both can be tuned per deployment.
+BROWSER_POOL_MAX_SITES = int(os.environ.get("BROWSER_POOL_MAX_SITES", 25))
+BROWSER_POOL_MAX_RSS_MB = int(os.environ.get("BROWSER_POOL_MAX_RSS_MB", 1500))
+
+# Threads the crawler loop uses for blocking work (HTTP fetches, sitemaps, cache I/O)
+CRAWLER_LOOP_THREADS = int(os.environ.get("CRAWLER_LOOP_THREADS", 32))
+
+
+# Every Playwright driver of the process (pools and Maps sessions alike) is
+# started under this lock, so a pool's before/after process diff only ever
+# sees its own driver
+PLAYWRIGHT_START_LOCK = threading.Lock()
+
+
+def _process_table():
+    """
+    Reads /proc once. Returns ({ppid: [child pids]}, {pid: rss in kB}); both
+    empty where /proc is unavailable.
+    """
+    children = {}
+    rss_kb = {}
+    if not os.path.isdir("/proc"):
+        return children, rss_kb
+
+    page_kb = os.sysconf("SC_PAGE_SIZE") // 1024
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                stat = f.read()
+            with open(f"/proc/{entry}/statm") as f:
+                resident_pages = int(f.read().split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        # The command name may contain spaces, so split after the closing paren.
+        ppid = int(stat.rsplit(")", 1)[1].split()[1])
+        children.setdefault(ppid, []).append(int(entry))
+        rss_kb[int(entry)] = resident_pages * page_kb
+    return children, rss_kb
+
+
+def _child_pids(pid):
+    children, _ = _process_table()
+    return set(children.get(pid, []))
+
+
+def _process_tree_rss_mb(root_pid):
+    """
+    Sums the resident memory of a process and all its descendants. Returns 0
+    where /proc is unavailable.
+    """
+    children, rss_kb = _process_table()
+    total_kb = 0
+    stack = [root_pid]
+    while stack:
+        pid = stack.pop()
+        total_kb += rss_kb.get(pid, 0)
+        stack.extend(children.get(pid, []))
+    return total_kb / 1024
+
+
+class BrowserPool:
+    """
+    Keeps one Playwright browser alive and hands out a fresh, isolated
+    BrowserContext per site. The browser is relaunched after a number of
+    sites, when it crashes, or when its memory grows past a threshold.
+    An optional ResourceBlockPolicy is installed on every context.
+
+    Async Playwright objects are bound to the event loop that created them, so
+    the pool lives on the worker's crawler loop (see run_on_crawler_loop) and
+    is shared by every crawl of the process. A browser due for recycling is
+    closed once its open contexts are done; new contexts wait for the relaunch.
+    """
+
+    def __init__(
+        self,
+        browser_type="firefox",
+        launch_options=None,
+        max_sites=BROWSER_POOL_MAX_SITES,
+        max_rss_mb=BROWSER_POOL_MAX_RSS_MB,
+        resource_policy=None,
+    ):
+        self.browser_type = browser_type
+        self.launch_options = launch_options or {"headless": True}
+        self.max_sites = max_sites
+        self.max_rss_mb = max_rss_mb
+        self.resource_policy = resource_policy
+
+        self._playwright = None
+        self._driver_pids = set()
+        self._browser = None
+        self._sites_served = 0
+        self._open_contexts = 0
+        self._recycle_due = False
+        self._condition = asyncio.Condition()
+
+    async def _ensure_browser(self):
+        if self._playwright is None:
+            # The Playwright driver started here is the root of the browser
+            # processes; the worker process itself is left out
+            with PLAYWRIGHT_START_LOCK:
+                before = _child_pids(os.getpid())
+                self._playwright = await async_playwright().start()
+                self._driver_pids = _child_pids(os.getpid()) - before
+
+        if self._browser is None or not self._browser.is_connected():
+            if self._browser is not None:
+                print("[INFO] Browser disconnected, relaunching...")
+            launcher = getattr(self._playwright, self.browser_type)
+            self._browser = await launcher.launch(**self.launch_options)
+            self._sites_served = 0
+        return self._browser
+
+    def _should_recycle(self):
+        if self._browser is None or not self._browser.is_connected():
+            return True
+        if self.max_sites and self._sites_served >= self.max_sites:
+            print(f"[INFO] Recycling browser after {self._sites_served} sites.")
+            return True
+        if self.max_rss_mb and self._driver_pids:
+            rss_mb = sum(_process_tree_rss_mb(pid) for pid in self._driver_pids)
+            if rss_mb > self.max_rss_mb:
+                print(f"[INFO] Recycling browser, memory at {rss_mb:.0f} MB.")
+                return True
+        return False
+
+    async def _close_browser(self):
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except Exception:
+                pass
+        self._browser = None
+        self._sites_served = 0
+
+    @asynccontextmanager
+    async def context(self, **context_options):
+        """
+        Yields a new BrowserContext for a single site and closes it afterwards.
+        """
+        async with self._condition:
+            await self._condition.wait_for(lambda: not self._recycle_due)
+            browser = await self._ensure_browser()
+            self._open_contexts += 1
+        try:
+            context = await browser.new_context(**context_options)
+            try:
+                if self.resource_policy is not None:
+                    await self.resource_policy.install_async(context)
+                yield context
+            finally:
+                try:
+                    await context.close()
+                except Exception:
+                    pass
+        finally:
+            async with self._condition:
+                self._open_contexts -= 1
+                self._sites_served += 1
+                if not self._recycle_due and self._should_recycle():
+                    self._recycle_due = True
+                if self._recycle_due and not self._open_contexts:
+                    await self._close_browser()
+                    self._recycle_due = False
+                    self._condition.notify_all()
+
+    async def close(self):
+        await self._close_browser()
+        if self._playwright is not None:
+            try:
+                await self._playwright.stop()
+            except Exception:
+                pass
+            self._playwright = None
+            self._driver_pids = set()
+
+
+_loop = None
+_pool = None
+_loop_lock = threading.Lock()
+
+
+def _crawler_loop():
+    """The worker's crawler event loop, running in its own thread, started on first use."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            loop.set_default_executor(
+                ThreadPoolExecutor(max_workers=CRAWLER_LOOP_THREADS, thread_name_prefix="crawler-io")
+            )
+            threading.Thread(target=loop.run_forever, name="crawler-loop", daemon=True).start()
+            _loop = loop
+        return _loop
+
+
+def run_on_crawler_loop(coro):
+    """
+    Runs a coroutine on the crawler loop and waits for its result. Callable
+    from any thread (Flask request threads, task workers), so every crawl of
+    the process shares the same long-lived browser.
+    """
+    return asyncio.run_coroutine_threadsafe(coro, _crawler_loop()).result()
+
+
+def get_browser_pool():
+    """Returns the worker's browser pool. Only use it from the crawler loop."""
+    global _pool
+    with _loop_lock:
+        if _pool is None:
+            _pool = BrowserPool(resource_policy=CRAWL_BLOCK_POLICY)
+        return _pool
+
+
+@atexit.register
+def _shutdown_pool():
+    if _loop is None:
+        return
+    if _pool is not None:
+        try:
+            asyncio.run_coroutine_threadsafe(_pool.close(), _loop).result(timeout=10)
+        except Exception:
+            pass
+    _loop.call_soon_threadsafe(_loop.stop)
@@ -0,0 +1,254 @@
+import os
+import threading
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+from src.scrapers.page_readiness import settle
+
+
+# CONSERVATIVE text matching - only clear "accept" language
+ACCEPT_KEYWORDS = [
+    # English - be specific
+    "accept all", "accept cookies", "agree and close", "i accept", 
+    "allow all", "accept and continue", "i agree",
+    
+    # Romanian - specific accept phrases (with and without diacritics)
+    "acceptă tot", "accepta tot", "accept tot",
+    "acceptă toate", "accepta toate", "accept toate",
+    "sunt de acord", "de acord",
+    "acceptă cookie", "accepta cookie", "accept cookie",
+    "acceptă și închide", "accepta si inchide", "accept si inchide",
+    "în regulă", "in regula",
+    "permite tot", "permite toate",
+    "continua", "continuă",
+]
+
+# Known good selectors for major cookie platforms
+KNOWN_ACCEPT_SELECTORS = [
+    # CookieScript (very common in Romania)
+    '#cookiescript_accept',
+    'button[data-cs-accept-all]',
+    '.cookiescript-accept',
+    
+    # OneTrust
+    '#onetrust-accept-btn-handler',
+    '#accept-recommended-btn-handler',
+    
+    # Cookiebot (popular in EU)
+    '#CybotCookiebotDialogBodyLevelButtonLevelOptinAllowAll',
+    '#CybotCookiebotDialogBodyButtonAccept',
+    '.CybotCookiebotDialogBodyButton',
+    
+    # Common Romanian patterns
+    'button[id*="accepta"]',
+    'button[class*="accepta"]',
+    'button[id*="accept-all"]',
+    'button[class*="accept-all"]',
+    'button[id*="cookie-accept"]',
+    'button[class*="cookie-accept"]',
+    '.cookie-consent-accept',
+    '.btn-accept-cookies',
+    '#accept-cookies',
+    '#acceptCookies',
+    
+    # GDPR generic
+    'button[aria-label*="Accept"]',
+    'button[aria-label*="Acceptă"]',
+    'button[aria-label*="Accepta"]',
+]
+
+HIDE_COOKIE_BANNERS_JS = """
+    // Only target common cookie banner containers
+    const selectors = [
+        '[id*="cookie"]',
+        '[class*="cookie"]',
+        '[id*="consent"]',
+        '[class*="consent"]',
+        '[id*="gdpr"]',
+        '[class*="gdpr"]'
+    ];
+    
+    selectors.forEach(sel => {
+        document.querySelectorAll(sel).forEach(el => {
+            // Only hide if it's position fixed/sticky (likely a banner)
+            const style = window.getComputedStyle(el);
+            if (style.position === 'fixed' || style.position === 'sticky') {
+                el.style.setProperty('display', 'none', 'important');
+            }
+        });
+    });
+    
+    // Re-enable scrolling
+    document.body.style.setProperty('overflow', 'auto', 'important');
+    document.documentElement.style.setProperty('overflow', 'auto', 'important');
+"""
+
+# Runs every consent strategy in a single page.evaluate: remembered strategies
+# first, then known CMP selectors, then accept keywords, and optionally hides
+# leftover banners. Returns {clicked, strategy, cmp, hidden}.
+CONSENT_JS = """
+(args) => {
+    const isVisible = (el) => {
+        if (!el || !el.isConnected) return false;
+        const rect = el.getBoundingClientRect();
+        if (rect.width === 0 || rect.height === 0) return false;
+        const style = window.getComputedStyle(el);
+        return style.visibility !== 'hidden' && style.display !== 'none' && style.opacity !== '0';
+    };
+
+    const detectCmp = () => {
+        if (window.OneTrust || document.getElementById('onetrust-banner-sdk')) return 'onetrust';
+        if (window.Cookiebot || document.getElementById('CybotCookiebotDialog')) return 'cookiebot';
+        if (window.CookieScript || document.getElementById('cookiescript_injected')) return 'cookiescript';
+        if (window.__tcfapi) return 'tcf';
+        return null;
+    };
+
+    const bySelector = (sel) => {
+        try {
+            return Array.from(document.querySelectorAll(sel)).find(isVisible) || null;
+        } catch (e) {
+            return null;  // Invalid selector in this document
+        }
+    };
+
+    // Collect button texts once; keyword matching then runs over plain strings
+    let buttons = null;
+    const byText = (keyword) => {
+        if (buttons === null) {
+            buttons = Array.from(document.querySelectorAll(
+                'button, [role="button"], input[type="button"], input[type="submit"]'
+            )).map(el => [el, (el.textContent || el.value || '').trim().toLowerCase()]);
+        }
+        // Prefer the shortest matching label: "Accept all" over "Accept all and read our policy"
+        let best = null;
+        for (const [el, text] of buttons) {
+            if (text.includes(keyword) && (best === null || text.length < best[1].length) && isVisible(el)) {
+                best = [el, text];
+            }
+        }
+        return best ? best[0] : null;
+    };
+
+    const find = (strategy) => {
+        const sep = strategy.indexOf(':');
+        const kind = strategy.slice(0, sep);
+        const value = strategy.slice(sep + 1);
+        return kind === 'selector' ? bySelector(value) : byText(value);
+    };
+
+    const cmp = detectCmp();
+    const candidates = [];
+    if (args.preferred) candidates.push(args.preferred);
+    if (cmp && args.preferredByCmp[cmp]) candidates.push(args.preferredByCmp[cmp]);
+    args.selectors.forEach(sel => candidates.push('selector:' + sel));
+    args.keywords.forEach(keyword => candidates.push('text:' + keyword));
+
+    for (const strategy of candidates) {
+        const el = find(strategy);
+        if (el) {
+            el.click();
+            return {clicked: true, strategy: strategy, cmp: cmp, hidden: false};
+        }
+    }
+
+    if (args.hideFallback) {
+        HIDE_BANNERS
+        return {clicked: false, strategy: null, cmp: cmp, hidden: true};
+    }
+    return {clicked: false, strategy: null, cmp: cmp, hidden: false};
+}
+""".replace("HIDE_BANNERS", "{" + HIDE_COOKIE_BANNERS_JS + "}")
+
+# Domains whose working strategy is remembered; the least recently used are forgotten
+CONSENT_STRATEGY_CACHE_SIZE = int(os.environ.get("CONSENT_STRATEGY_CACHE_SIZE", 10000))
+
+# Strategy that worked last time, per domain (LRU) and per CMP ("selector:..." or "text:...")
+_strategy_by_domain = OrderedDict()
+_strategy_by_cmp = {}
+_lock = threading.Lock()
+
+
+def _domain_of(url):
+    host = (urlparse(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def _consent_frames(page):
+    """Child frames that look like consent dialogs (e.g. CookieScript iframes)."""
+    return [
+        frame for frame in page.frames
+        if frame != page.main_frame and any(
+            marker in (frame.url + frame.name).lower() for marker in ("cookie", "consent", "cmp", "gdpr")
+        )
+    ]
+
+
+def _script_args(domain, hide_fallback):
+    with _lock:
+        preferred = _strategy_by_domain.get(domain)
+        if preferred is not None:
+            _strategy_by_domain.move_to_end(domain)
+        return {
+            "selectors": KNOWN_ACCEPT_SELECTORS,
+            "keywords": ACCEPT_KEYWORDS,
+            "preferred": preferred,
+            "preferredByCmp": dict(_strategy_by_cmp),
+            "hideFallback": hide_fallback,
+        }
+
+
+def _remember(domain, result):
+    with _lock:
+        _strategy_by_domain[domain] = result["strategy"]
+        _strategy_by_domain.move_to_end(domain)
+        while len(_strategy_by_domain) > CONSENT_STRATEGY_CACHE_SIZE:
+            _strategy_by_domain.popitem(last=False)
+        if result.get("cmp"):
+            _strategy_by_cmp[result["cmp"]] = result["strategy"]
+
+
+def _report(result):
+    if result.get("clicked"):
+        print(f"  -> ✓ Accepted cookies via {result['strategy']} (CMP: {result.get('cmp') or 'unknown'})")
+    elif result.get("hidden"):
+        print("  -> No accept button found, forced overlay removal")
+    else:
+        print("  -> No cookie banner found or already dismissed")
+
+
+async def dismiss_consent(page):
+    """
+    Accepts the cookie banner on `page` with one in-page script, falling back to
+    consent iframes and then to hiding the banner. Returns True if a banner was
+    accepted or hidden.
+    """
+    domain = _domain_of(page.url)
+    frames = _consent_frames(page)
+
+    try:
+        result = await page.evaluate(CONSENT_JS, _script_args(domain, hide_fallback=not frames))
+        for frame in frames:
+            if result.get("clicked"):
+                break
+            try:
+                result = await frame.evaluate(CONSENT_JS, _script_args(domain, hide_fallback=False))
+            except Exception:
+                continue
+        if frames and not result.get("clicked"):
+            result = await page.evaluate(CONSENT_JS, {**_script_args(domain, hide_fallback=True), "selectors": [], "keywords": []})
+    except Exception as e:
+        print(f"  -> ✗ Could not run consent script: {e}")
+        return False
+
+    _report(result)
+    if result.get("clicked"):
+        _remember(domain, result)
+        await settle(page, 1000)  # Wait for banner to close
+    return bool(result.get("clicked") or result.get("hidden"))
+
+
+def consent_stats():
+    """Remembered strategies, for debugging which CMPs we see most."""
+    with _lock:
+        return {"domains": len(_strategy_by_domain), "by_cmp": dict(_strategy_by_cmp)}
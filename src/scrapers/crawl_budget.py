@@ -0,0 +1,91 @@
+import os
+import threading
+import time
+
+
+# Per-site limits: wall-clock seconds, bytes of HTML downloaded, browser navigations
+CRAWL_SITE_DEADLINE_S = float(os.environ.get("CRAWL_SITE_DEADLINE_S", 45))
+CRAWL_SITE_MAX_BYTES = int(os.environ.get("CRAWL_SITE_MAX_BYTES", 8 * 1024 * 1024))
+CRAWL_SITE_MAX_NAVIGATIONS = int(os.environ.get("CRAWL_SITE_MAX_NAVIGATIONS", 12))
+
+# Below this, starting another request or navigation is not worth it
+MIN_USEFUL_MS = 500
+
+
+class CrawlBudget:
+    """
+    Limits for crawling one site, shared by every step of the crawl (discovery,
+    HTTP fetches, browser navigations, cookie handling). Steps ask for their
+    timeout through timeout_ms()/timeout_s() so nothing can wait past the
+    deadline, and check exhausted() before starting. Once a limit is hit,
+    stop_reason says which one ("deadline", "max_bytes" or "max_navigations")
+    and the crawl returns what it has gathered so far.
+
+    Safe to use from the crawl's worker threads.
+    """
+
+    def __init__(
+        self,
+        deadline_s=CRAWL_SITE_DEADLINE_S,
+        max_bytes=CRAWL_SITE_MAX_BYTES,
+        max_navigations=CRAWL_SITE_MAX_NAVIGATIONS,
+    ):
+        self.deadline_s = deadline_s
+        self.max_bytes = max_bytes
+        self.max_navigations = max_navigations
+
+        self.started = time.monotonic()
+        self.bytes = 0
+        self.navigations = 0
+        self.stop_reason = None
+        self._lock = threading.Lock()
+
+    def _stop(self, reason):
+        with self._lock:
+            if self.stop_reason is None:
+                self.stop_reason = reason
+                print(f"  -> Crawl budget exhausted ({reason}), keeping partial results")
+
+    def remaining_ms(self):
+        return max(0.0, self.deadline_s * 1000 - (time.monotonic() - self.started) * 1000)
+
+    def timeout_ms(self, cap_ms):
+        """Timeout for one step: `cap_ms`, shortened to what is left of the deadline."""
+        return max(1, int(min(cap_ms, self.remaining_ms())))
+
+    def timeout_s(self, cap_s):
+        return self.timeout_ms(cap_s * 1000) / 1000
+
+    def exhausted(self):
+        """True once any limit is hit; records the reason the first time."""
+        if self.stop_reason is not None:
+            return True
+        if self.remaining_ms() < MIN_USEFUL_MS:
+            self._stop("deadline")
+        elif self.max_bytes and self.bytes >= self.max_bytes:
+            self._stop("max_bytes")
+        return self.stop_reason is not None
+
+    def charge_bytes(self, count):
+        with self._lock:
+            self.bytes += count
+
+    def start_navigation(self):
+        """Counts a browser navigation. Returns False when it must not be started."""
+        if self.exhausted():
+            return False
+        with self._lock:
+            allowed = not self.max_navigations or self.navigations < self.max_navigations
+            if allowed:
+                self.navigations += 1
+        if not allowed:
+            self._stop("max_navigations")
+        return allowed
+
+    def stats(self):
+        return {
+            "elapsed_s": round(time.monotonic() - self.started, 2),
+            "bytes": self.bytes,
+            "navigations": self.navigations,
+            "stop_reason": self.stop_reason,
+        }
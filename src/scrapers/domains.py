@@ -0,0 +1,64 @@
+from functools import lru_cache
+from urllib.parse import urljoin, urlparse
+
+import tldextract
+
+
+# Public suffix list bundled with tldextract. No suffix_list_urls and no cache
+# dir means it never goes to the network or touches disk, so no worker ever
+# blocks on a suffix list download.
+_EXTRACTOR = tldextract.TLDExtract(suffix_list_urls=(), cache_dir=None)
+
+DOMAIN_CACHE_SIZE = 65536
+
+
+def _host(url_or_host):
+    if "//" in url_or_host:
+        return (urlparse(url_or_host).hostname or "").lower()
+    return url_or_host.split(":", 1)[0].lower()
+
+
+@lru_cache(maxsize=DOMAIN_CACHE_SIZE)
+def split_host(host):
+    """Splits a host into (subdomain, domain, suffix) using the bundled suffix list."""
+    result = _EXTRACTOR(host)
+    return result.subdomain, result.domain, result.suffix
+
+
+def domain_label(url_or_host):
+    """The registrable label of a URL or host: "shop.example.co.uk" -> "example"."""
+    return split_host(_host(url_or_host))[1]
+
+
+def registered_domain(url_or_host):
+    """The registered domain of a URL or host: "shop.example.co.uk" -> "example.co.uk"."""
+    _, domain, suffix = split_host(_host(url_or_host))
+    if not domain or not suffix:
+        return ""
+    return f"{domain}.{suffix}"
+
+
+class InternalLinkClassifier:
+    """
+    Decides which links of a site are internal. Build it once per crawl: the
+    base domain is computed up front and host lookups are memoised, so
+    filtering hundreds of anchors costs a dict lookup each.
+
+    Like the original check, links count as internal when their registrable
+    label matches the base one ("example" for example.com and example.ro).
+    """
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.base_domain = domain_label(base_url)
+
+    def is_internal(self, link):
+        if not link:
+            return False
+        if link.startswith(("#", "mailto:", "tel:")):
+            return False
+        return domain_label(urljoin(self.base_url, link)) == self.base_domain
+
+    def filter(self, links):
+        """Internal links of `links`, in order, excluding the base URL itself."""
+        return [link for link in links if link != self.base_url and self.is_internal(link)]
@@ -0,0 +1,155 @@
+import re
+from urllib.parse import unquote
+
+from src.scrapers.domains import registered_domain
+
+
+EMAIL_REGEX = r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}"
+EMAIL_RE = re.compile(EMAIL_REGEX)
+
+# "office [at] firma [dot] ro", "office(at)firma.ro", "office {at} firma {dot} ro".
+# A plain "." only counts between two labels with no whitespace around it, so
+# a sentence ending right after the address does not join the next word in;
+# whitespace is only allowed around spelled-out dots such as "[dot]" or " dot ".
+_OBFUSCATED_DOT = r"(?:\s*[\[({]\s*(?:dot|\.)\s*[\])}]\s*|\s+dot\s+|\.)"
+OBFUSCATED_EMAIL_RE = re.compile(
+    r"([a-zA-Z0-9._%+-]+)\s*[\[({]\s*(?:at|@)\s*[\])}]\s*"
+    rf"([a-zA-Z0-9-]+(?:{_OBFUSCATED_DOT}[a-zA-Z0-9-]+)+)",
+    re.IGNORECASE,
+)
+_OBFUSCATED_DOT_RE = re.compile(_OBFUSCATED_DOT, re.IGNORECASE)
+
+# Cloudflare "Email Address Obfuscation"
+_CF_PROTECTION_PATH = "/cdn-cgi/l/email-protection"
+
+# Things that look like emails but are file names, placeholders or tracking ids
+_FILE_SUFFIXES = (
+    ".png", ".jpg", ".jpeg", ".gif", ".webp", ".svg", ".ico", ".bmp", ".css",
+    ".js", ".json", ".map", ".woff", ".woff2", ".ttf", ".mp4", ".pdf",
+)
+_PLACEHOLDER_DOMAINS = {
+    "example.com", "example.org", "domain.com", "email.com", "yourdomain.com",
+    "yoursite.com", "mysite.com", "site.com", "test.com", "sentry.io",
+    "sentry.wixpress.com", "sentry-next.wixpress.com", "wixpress.com",
+}
+_PLACEHOLDER_LOCAL_PARTS = {"name", "email", "your", "youremail", "yourname", "user", "username", "example"}
+_HEX_ID_RE = re.compile(r"^[0-9a-f]{16,}$")
+
+# Generic inboxes a business actually reads, best first
+ROLE_LOCAL_PARTS = [
+    "office", "contact", "info", "hello", "sales", "vanzari", "comenzi",
+    "secretariat", "receptie", "support", "suport", "admin",
+]
+_NO_REPLY_RE = re.compile(r"^(no-?reply|do-?not-?reply|mailer-daemon|postmaster|bounce)", re.IGNORECASE)
+
+# How much each signal is worth when ranking the addresses found on a site
+SOURCE_SCORES = {"mailto": 2, "cfemail": 2, "text": 1, "obfuscated": 1}
+SAME_DOMAIN_SCORE = 6
+CONTACT_PAGE_SCORE = 4
+ROLE_SCORE = 3
+NO_REPLY_SCORE = -10
+
+
+def decode_cfemail(encoded):
+    """Decodes a Cloudflare data-cfemail hex string: the first byte is the XOR key."""
+    try:
+        key = int(encoded[:2], 16)
+        return "".join(chr(int(encoded[i:i + 2], 16) ^ key) for i in range(2, len(encoded), 2))
+    except ValueError:
+        return None
+
+
+def normalize_email(address):
+    """Lowercases and trims an address; returns None if it is not a plausible email."""
+    address = unquote(address).strip().strip(".,;:'\"<>()[]").lower()
+    if not EMAIL_RE.fullmatch(address) or len(address) > 254:
+        return None
+
+    local, _, domain = address.rpartition("@")
+    if domain.endswith(_FILE_SUFFIXES) or "@2x" in address or "@3x" in address:
+        return None  # image@2x.png, bundle@1.2.3.js
+    if domain in _PLACEHOLDER_DOMAINS or local in _PLACEHOLDER_LOCAL_PARTS:
+        return None
+    if _HEX_ID_RE.match(local):
+        return None  # Error-tracking DSNs such as 8f2c...@o123.ingest.sentry.io
+    return address
+
+
+def extract_emails(tree, visible_text_xpath):
+    """
+    Finds the addresses in a parsed document, without looking at scripts, styles
+    or attribute blobs. Returns {email: source}, in document order, where source
+    is "mailto", "cfemail", "text" or "obfuscated" (first one wins, mailto first).
+    """
+    found = {}
+
+    def add(address, source):
+        address = normalize_email(address) if address else None
+        if address and address not in found:
+            found[address] = source
+
+    for href in tree.xpath("//a[starts-with(translate(@href, 'MAILTO', 'mailto'), 'mailto:')]/@href"):
+        for address in href[len("mailto:"):].split("?", 1)[0].split(","):
+            add(address, "mailto")
+
+    for encoded in tree.xpath("//@data-cfemail"):
+        add(decode_cfemail(encoded), "cfemail")
+    for href in tree.xpath(f"//a[contains(@href, '{_CF_PROTECTION_PATH}#')]/@href"):
+        add(decode_cfemail(href.rsplit("#", 1)[1]), "cfemail")
+
+    for text in tree.xpath("//" + visible_text_xpath):
+        if "@" in text:
+            for address in EMAIL_RE.findall(text):
+                add(address, "text")
+        lowered = text.lower()
+        if "at" in lowered and ("[" in text or "(" in text or "{" in text):
+            for local, domain in OBFUSCATED_EMAIL_RE.findall(text):
+                domain = _OBFUSCATED_DOT_RE.sub(".", domain)
+                # Must end in a real public suffix: "firma.ro.program" does not
+                if registered_domain(domain):
+                    add(f"{local}@{domain}", "obfuscated")
+    return found
+
+
+class EmailRanker:
+    """
+    Collects the addresses found across the pages of one site and picks the
+    one most likely to reach the business: same registered domain as the
+    site, found on a contact page, a role inbox such as office@, and from a
+    mailto: link all count in its favour; no-reply addresses count against.
+    Ties go to the address seen first.
+    """
+
+    def __init__(self, site_url):
+        self.site_domain = registered_domain(site_url)
+        self._candidates = {}
+
+    def add(self, email_sources, from_contact_page=False):
+        """Adds a page's {email: source} map."""
+        for email, source in email_sources.items():
+            candidate = self._candidates.setdefault(
+                email, {"order": len(self._candidates), "sources": set(), "contact_page": False}
+            )
+            candidate["sources"].add(source)
+            candidate["contact_page"] |= from_contact_page
+
+    def score(self, email):
+        candidate = self._candidates[email]
+        local, _, domain = email.rpartition("@")
+        score = max(SOURCE_SCORES.get(source, 0) for source in candidate["sources"])
+        if self.site_domain and registered_domain(domain) == self.site_domain:
+            score += SAME_DOMAIN_SCORE
+        if candidate["contact_page"]:
+            score += CONTACT_PAGE_SCORE
+        if local in ROLE_LOCAL_PARTS:
+            score += ROLE_SCORE - ROLE_LOCAL_PARTS.index(local) / len(ROLE_LOCAL_PARTS)
+        if _NO_REPLY_RE.match(local):
+            score += NO_REPLY_SCORE
+        return score
+
+    def ranked(self):
+        return sorted(self._candidates, key=lambda email: (-self.score(email), self._candidates[email]["order"]))
+
+    def best(self):
+        ranked = self.ranked()
+        return ranked[0] if ranked else None
@@ -0,0 +1,83 @@
+from urllib.parse import urljoin
+
+import lxml.html
+from readability import Document
+
+from src.scrapers.email_extractor import extract_emails
+
+# Text nodes outside of non-visible elements, in document order
+_VISIBLE_TEXT = "text()[not(ancestor::script or ancestor::style or ancestor::noscript or ancestor::template)]"
+
+
+def tree_text(element):
+    """
+    Visible text of an lxml element, one stripped string per line. Equivalent to
+    BeautifulSoup's get_text(separator="\\n", strip=True).
+    """
+    parts = (part.strip() for part in element.xpath(".//" + _VISIBLE_TEXT))
+    return "\n".join(part for part in parts if part)
+
+
+class ParsedPage:
+    """
+    A page parsed once with lxml. Links, emails and text are all derived from
+    the same tree:
+
+    - links: absolute hrefs of all anchors, in document order
+    - emails: addresses from mailto: links, Cloudflare-protected links and
+      visible text, de-duplicated; email_sources maps each one to its source
+    - text: Readability text, or with fallback=True the <main>/<body> text when
+      Readability extracts less than 500 characters
+    - needs_render: set by the HTTP tier when the static text is too thin and
+      the page should be rendered in the browser; links and emails still count
+    """
+
+    def __init__(self, tree, url, fallback=False):
+        self.url = url
+        self.tree = tree
+
+        # Links and emails first: Readability removes [hidden] and display:none
+        # elements from the tree it is given, in place. Its other cleaning
+        # (scripts, styles, ...) happens on a copy, so after parsing the tree
+        # has lost its hidden elements and nothing else.
+        self.links = self._extract_links()
+        self.email_sources = extract_emails(tree, _VISIBLE_TEXT)
+        self.emails = list(self.email_sources)
+        self.text = self._extract_text(fallback)
+        self.needs_render = False
+
+    def add_emails(self, email_sources):
+        """Adds addresses found in another copy of the page (e.g. its static HTML)."""
+        for email, source in email_sources.items():
+            self.email_sources.setdefault(email, source)
+        self.emails = list(self.email_sources)
+
+    def _extract_links(self):
+        links = []
+        for href in self.tree.xpath("//a/@href"):
+            href = href.strip()
+            if not href or href.startswith(("#", "mailto:", "tel:", "javascript:")):
+                continue
+            try:
+                links.append(urljoin(self.url, href))
+            except ValueError:
+                continue  # Malformed URL such as "http://[broken"
+        return links
+
+    def _extract_text(self, fallback):
+        summary = Document(self.tree).summary()
+        text = tree_text(lxml.html.fromstring(summary)) if summary.strip() else ""
+
+        # Simplified direct extraction fallback for brevity
+        if fallback and len(text) < 500:
+            main_content = self.tree.find(".//main")
+            if main_content is None:
+                main_content = self.tree.find(".//body")
+            if main_content is not None:
+                text = tree_text(main_content)
+        return text
+
+
+def parse_page(html, url, fallback=False):
+    """Parses an HTML document once and extracts everything the crawler needs from it."""
+    return ParsedPage(lxml.html.document_fromstring(html), url, fallback=fallback)
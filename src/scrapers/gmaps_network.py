@@ -0,0 +1,230 @@
+import hashlib
+import json
+import os
+import re
+from urllib.parse import parse_qs, quote, urlparse
+
+
+# Set to a directory to save every raw search payload, e.g. to record test fixtures
+MAPS_CAPTURE_RECORD_DIR = os.environ.get("MAPS_CAPTURE_RECORD_DIR")
+
+# Google prefixes its JSON responses with this to break <script> inclusion
+XSSI_PREFIX = ")]}'"
+
+# "0x47b2c1...:0x8a3f..." feature ids identify a place in the search payloads
+_FEATURE_ID_RE = re.compile(r"^0x[0-9a-f]+:0x[0-9a-f]+$")
+
+# A place record is a long positional array; fewer items than this cannot hold the fields we read
+_MIN_PLACE_RECORD_LEN = 14
+
+# Positions of the fields inside a place record
+_NAME = (11,)
+_FEATURE_ID = (10,)
+_PLACE_ID = (78,)
+_WEBSITE = (7, 0)
+_RATING = (4, 7)
+_REVIEWS = (4, 8)
+_CATEGORIES = (13,)
+_ADDRESS = (39,)
+_ADDRESS_PARTS = (2,)
+_PHONE = (178, 0, 0)
+
+
+def is_search_response(url):
+    """True for the XHR responses that carry a batch of Maps search results."""
+    parsed = urlparse(url)
+    return parsed.path.startswith("/search") and "tbm=map" in parsed.query
+
+
+def _dig(data, *path):
+    """data[path[0]][path[1]]..., or None as soon as a step does not exist."""
+    for index in path:
+        try:
+            data = data[index]
+        except (IndexError, KeyError, TypeError):
+            return None
+    return data
+
+
+def _loads(text):
+    text = text.strip()
+    if text.startswith(XSSI_PREFIX):
+        text = text[len(XSSI_PREFIX):]
+    return json.loads(text)
+
+
+def _decode_payload(text):
+    """
+    Parses a search response body. Returns None if it is not JSON. Some
+    responses wrap the real payload as a string in {"d": ")]}'..."}.
+    """
+    try:
+        data = _loads(text)
+        if isinstance(data, dict) and isinstance(data.get("d"), str):
+            data = _loads(data["d"])
+    except (ValueError, TypeError):
+        return None
+    return data
+
+
+def _is_place_record(item):
+    return (
+        isinstance(item, list)
+        and len(item) > _MIN_PLACE_RECORD_LEN
+        and isinstance(_dig(item, *_NAME), str)
+        and isinstance(_dig(item, *_FEATURE_ID), str)
+        and bool(_FEATURE_ID_RE.match(_dig(item, *_FEATURE_ID)))
+    )
+
+
+def _iter_place_records(data):
+    """
+    Finds the place records anywhere in the payload. Searching the structure
+    instead of following a fixed path keeps working when Google moves the
+    results list around.
+    """
+    stack = [data]
+    while stack:
+        item = stack.pop()
+        if not isinstance(item, list):
+            continue
+        if _is_place_record(item):
+            yield item
+            continue
+        stack.extend(reversed(item))
+
+
+def _clean_website(value):
+    if not isinstance(value, str) or not value:
+        return None
+    if value.startswith("/url?"):
+        # Redirect through Google: the target is in the "q" parameter
+        value = parse_qs(urlparse(value).query).get("q", [None])[0]
+    return value if value and value.startswith("http") else None
+
+
+def _number(value, cast):
+    try:
+        return cast(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _address(record):
+    address = _dig(record, *_ADDRESS)
+    if isinstance(address, str) and address:
+        return address
+    parts = _dig(record, *_ADDRESS_PARTS)
+    if isinstance(parts, list):
+        return ", ".join(part for part in parts if isinstance(part, str)) or None
+    return None
+
+
+def parse_place(record):
+    """
+    Turns one place record into a lead with the same fields as the DOM
+    harvester (see gmaps_scraper.parse_card), plus place_id.
+    """
+    # The feature id is also in the place links of the result cards, so leads
+    # from both sources share one place_id
+    feature_id = _dig(record, *_FEATURE_ID)
+    google_place_id = _dig(record, *_PLACE_ID)
+
+    if isinstance(google_place_id, str) and google_place_id.startswith("ChIJ"):
+        place_url = f"https://www.google.com/maps/place/?q=place_id:{google_place_id}"
+    else:
+        place_url = f"https://www.google.com/maps/place/data=!4m2!3m1!1s{quote(feature_id, safe=':')}"
+
+    categories = _dig(record, *_CATEGORIES)
+    phone = _dig(record, *_PHONE)
+    website = _clean_website(_dig(record, *_WEBSITE))
+    return {
+        "name": _dig(record, *_NAME),
+        "link": website or "No Website",
+        "place_id": feature_id,
+        "place_url": place_url,
+        "website": website,
+        "rating": _number(_dig(record, *_RATING), float),
+        "reviews": _number(_dig(record, *_REVIEWS), int),
+        "category": categories[0] if isinstance(categories, list) and categories else None,
+        "address": _address(record),
+        "phone": phone if isinstance(phone, str) else None,
+    }
+
+
+def parse_search_payload(text):
+    """
+    Parses the body of one Maps search response into leads, in payload order.
+    Records that cannot be read are skipped; a body that is not a search
+    payload gives an empty list. Needs no browser, so recorded payloads can be
+    parsed offline.
+    """
+    data = _decode_payload(text)
+    if data is None:
+        return []
+
+    leads = []
+    for record in _iter_place_records(data):
+        try:
+            leads.append(parse_place(record))
+        except Exception as e:
+            print(f"  -> Skipping unreadable place record: {e}")
+    return leads
+
+
+class NetworkCapture:
+    """
+    Listens to a Maps page's search responses and turns every batch of results
+    into leads as it arrives, de-duplicated by place id. Responses are queued
+    by the listener and parsed by collect(), which the scroller calls after
+    each batch, so no body is read inside Playwright's event dispatch.
+    """
+
+    def __init__(self, page):
+        self.page = page
+        self.leads = {}
+        self.responses = 0
+        self.failed = 0
+        self._pending = []
+        page.on("response", self._on_response)
+
+    def _on_response(self, response):
+        if is_search_response(response.url):
+            self._pending.append(response)
+
+    def _record(self, url, text):
+        os.makedirs(MAPS_CAPTURE_RECORD_DIR, exist_ok=True)
+        name = hashlib.sha1(url.encode("utf-8")).hexdigest()[:16]
+        with open(os.path.join(MAPS_CAPTURE_RECORD_DIR, f"{name}.txt"), "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def collect(self):
+        """Parses the responses received since the last call. Returns the number of new leads."""
+        pending, self._pending = self._pending, []
+        added = 0
+        for response in pending:
+            self.responses += 1
+            try:
+                text = response.text()
+            except Exception as e:
+                self.failed += 1
+                print(f"  -> Could not read Maps search response: {e}")
+                continue
+            if MAPS_CAPTURE_RECORD_DIR:
+                self._record(response.url, text)
+
+            leads = parse_search_payload(text)
+            if not leads:
+                self.failed += 1
+            for lead in leads:
+                if lead["place_id"] not in self.leads:
+                    self.leads[lead["place_id"]] = lead
+                    added += 1
+        return added
+
+    def close(self):
+        self.collect()
+        self.page.remove_listener("response", self._on_response)
+
+    def results(self):
+        return list(self.leads.values())
@@ -1,7 +1,204 @@
 import csv
+import os
+import re
 import time
 
-from playwright.sync_api import sync_playwright
+from src.scrapers.gmaps_network import NetworkCapture
+from src.scrapers.gmaps_session import get_maps_session, run_on_maps_worker
+
+# "dom" reads the rendered result cards; "network" parses the search responses,
+# fills their gaps from the result cards and adds the cards it did not see
+# (the first batch comes with the page itself)
+MAPS_CAPTURE_MODE = os.environ.get("MAPS_CAPTURE_MODE", "dom")
+
+# Total time for scrolling the results feed, and the wait for one batch of new cards (ms)
+MAPS_SCROLL_DEADLINE_MS = int(os.environ.get("MAPS_SCROLL_DEADLINE_MS", 60000))
+MAPS_BATCH_WAIT_MS = 5000
+
+# Scrolls in a row that bring no new cards before giving up
+MAPS_MAX_STALLED_SCROLLS = 3
+
+FEED_SELECTOR = 'div[role="feed"]'
+WEBSITE_CARD_SELECTOR = 'a[data-value="Website"]'
+PLACE_CARD_SELECTOR = 'a[href*="/place/"]'
+
+# Shown at the bottom of the feed once Maps has no more results
+END_OF_LIST_TEXT = "You've reached the end of the list"
+
+# Counts the result cards matching cardSelector, leaving out the cards that
+# contain withoutSelector (e.g. place cards that do have a website link)
+_COUNT_CARDS_JS = """
+    const countCards = (feed) => {
+        const links = feed.querySelectorAll(cardSelector);
+        if (!withoutSelector) return links.length;
+        let count = 0;
+        for (const link of links) {
+            const card = link.closest('[role="article"]') || link.parentElement;
+            if (!card.querySelector(withoutSelector)) count++;
+        }
+        return count;
+    };
+"""
+
+# {count, end}: matching cards in the feed, and whether the end marker is shown
+_FEED_STATE_JS = """
+([feedSelector, cardSelector, endText, withoutSelector]) => {""" + _COUNT_CARDS_JS + """
+    const feed = document.querySelector(feedSelector);
+    if (!feed) return {count: 0, end: false};
+    const tail = Array.from(feed.children).slice(-3);
+    return {
+        count: countCards(feed),
+        end: tail.some(el => el.textContent.includes(endText)),
+    };
+}
+"""
+
+# Truthy once the feed has more than `previous` matching cards or shows the end marker
+_MORE_CARDS_JS = """
+([feedSelector, cardSelector, endText, withoutSelector, previous]) => {""" + _COUNT_CARDS_JS + """
+    const feed = document.querySelector(feedSelector);
+    if (!feed) return false;
+    if (countCards(feed) > previous) return true;
+    return Array.from(feed.children).slice(-3).some(el => el.textContent.includes(endText));
+}
+"""
+
+# One record per loaded result card: the raw pieces, parsed in Python by parse_card()
+_HARVEST_CARDS_JS = """
+([feedSelector, placeSelector, websiteSelector]) => {
+    const feed = document.querySelector(feedSelector);
+    if (!feed) return [];
+    const records = [];
+    const seen = new Set();
+    for (const link of feed.querySelectorAll(placeSelector)) {
+        if (seen.has(link.href)) continue;
+        seen.add(link.href);
+        const card = link.closest('[role="article"]') || link.parentElement;
+        const website = card.querySelector(websiteSelector);
+        const stars = card.querySelector('span[role="img"][aria-label]');
+        records.push({
+            name: link.getAttribute("aria-label") || "",
+            place_url: link.href,
+            website: website ? website.href : null,
+            rating_label: stars ? stars.getAttribute("aria-label") : "",
+            lines: card.innerText.split("\\n").map(line => line.trim()).filter(Boolean),
+        });
+    }
+    return records;
+}
+"""
+
+_RATING_RE = re.compile(r"(\d+(?:[.,]\d+)?)\s*stars?", re.IGNORECASE)
+_REVIEWS_RE = re.compile(r"([\d.,]+)\s*reviews?", re.IGNORECASE)
+# "4.6(1,234)" as rendered on the card
+_RATING_LINE_RE = re.compile(r"^(\d[.,]\d)\s*\(([\d.,]+)\)")
+_PHONE_RE = re.compile(r"^\+?[\d(][\d\s().-]{6,}\d$")
+# Separators between the facts of one card line
+_CARD_SEPARATORS_RE = re.compile(r"\s*[·⋅]\s*")
+# Icons are rendered as private-use characters
+_ICON_RE = re.compile("[\ue000-\uf8ff]")
+# Place links carry the feature id: ".../data=!4m7!3m6!1s0x47b2...:0x8a3f...!8m2..."
+_PLACE_URL_ID_RE = re.compile(r"!1s(0x[0-9a-f]+:0x[0-9a-f]+)")
+
+
+def _to_number(text, cast):
+    try:
+        # Review counts use "," or "." as thousands separator, ratings use either as decimal point
+        return cast(re.sub(r"[.,\s]", "", text) if cast is int else text.replace(",", "."))
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_card(record):
+    """
+    Turns a raw card record from _HARVEST_CARDS_JS into a lead: name, link
+    (website or "No Website"), place_id, place_url, website, rating, reviews,
+    category, address and phone. Fields not shown on the card are None.
+    """
+    name = record.get("name") or ""
+    rating = reviews = None
+
+    rating_match = _RATING_RE.search(record.get("rating_label") or "")
+    if rating_match:
+        rating = _to_number(rating_match.group(1), float)
+    reviews_match = _REVIEWS_RE.search(record.get("rating_label") or "")
+    if reviews_match:
+        reviews = _to_number(reviews_match.group(1), int)
+
+    facts = []
+    for line in record.get("lines") or []:
+        line_match = _RATING_LINE_RE.match(line)
+        if line_match:
+            rating = rating if rating is not None else _to_number(line_match.group(1), float)
+            reviews = reviews if reviews is not None else _to_number(line_match.group(2), int)
+            continue
+        if line == name:
+            continue
+        parts = [_ICON_RE.sub("", part).strip() for part in _CARD_SEPARATORS_RE.split(line)]
+        facts.append([part for part in parts if part])
+
+    phone = None
+    for parts in facts:
+        for part in parts:
+            if _PHONE_RE.match(part):
+                phone = part
+                break
+        if phone:
+            break
+
+    # The first line of facts is "Category · Address" (price levels like "$$" left out)
+    category = address = None
+    for parts in facts:
+        parts = [part for part in parts if part != phone and not set(part) <= set("$€£")]
+        if parts:
+            category = parts[0]
+            address = parts[1] if len(parts) > 1 else None
+            break
+
+    website = record.get("website")
+    place_url = record.get("place_url")
+    place_id_match = _PLACE_URL_ID_RE.search(place_url or "")
+    return {
+        "name": name,
+        "link": website or "No Website",
+        "place_id": place_id_match.group(1) if place_id_match else place_url,
+        "place_url": place_url,
+        "website": website,
+        "rating": rating,
+        "reviews": reviews,
+        "category": category,
+        "address": address,
+        "phone": phone,
+    }
+
+
+def harvest_cards(page):
+    """Extracts every loaded result card in a single evaluate call."""
+    records = page.evaluate(_HARVEST_CARDS_JS, [FEED_SELECTOR, PLACE_CARD_SELECTOR, WEBSITE_CARD_SELECTOR])
+    return [parse_card(record) for record in records]
+
+
+def merge_leads(captured, cards):
+    """
+    Leads parsed from the search responses, completed field by field from the
+    result card of the same place: a field the payload did not have (or that
+    moved within the record) is taken from the card instead of being lost.
+    Cards of places missing from the responses come last.
+    """
+    cards_by_place = {card["place_id"]: card for card in cards if card.get("place_id")}
+    merged = []
+    for lead in captured:
+        card = cards_by_place.get(lead["place_id"])
+        if card:
+            lead = dict(lead)
+            for field, value in card.items():
+                if lead.get(field) is None:
+                    lead[field] = value
+            lead["link"] = lead["website"] or "No Website"
+        merged.append(lead)
+
+    seen = {lead["place_id"] for lead in captured}
+    return merged + [card for card in cards if card.get("place_id") not in seen]
 
 
 def combine_results(list1, list2, merge_key="name"):
@@ -39,88 +236,115 @@ def combine_results(list1, list2, merge_key="name"):
     return list(merged_data.values())
 
 
-def extract_info(page, business_cards, max_results):
-    total = min(business_cards.count(), max_results)
-    print(
-        f"[INFO] Found {business_cards.count()} businesses. Getting top {total} names and links."
-    )
-
-    results = []
+def scroll_feed(
+    page, card_selector, max_results, deadline_ms=MAPS_SCROLL_DEADLINE_MS, on_batch=None, without_selector=None
+):
+    """
+    Scrolls the results feed until `max_results` cards matching `card_selector`
+    (and not containing `without_selector`, if given) are loaded, Maps shows
+    the end of the list, or `deadline_ms` has passed.
+    After each scroll it waits for new cards to appear instead of sleeping,
+    then calls `on_batch()` if given. Returns the number of matching cards loaded.
+    """
+    start = time.monotonic()
+    feed = page.locator(FEED_SELECTOR)
+    state_args = [FEED_SELECTOR, card_selector, END_OF_LIST_TEXT, without_selector]
+    stalled = 0
 
-    for i in range(total):
-        card = business_cards.nth(i)
-        card.scroll_into_view_if_needed()
-        name = card.get_attribute("aria-label")
+    while True:
+        state = page.evaluate(_FEED_STATE_JS, state_args)
+        count = state["count"]
+        if count >= max_results:
+            print(f"[INFO] Loaded {count} results.")
+            break
+        if state["end"]:
+            print(f"[INFO] Reached the end of the list with {count} results.")
+            break
 
-        website_locator = page.locator('a[data-value="Website"]')
+        remaining_ms = deadline_ms - (time.monotonic() - start) * 1000
+        if remaining_ms <= 0:
+            print(f"[INFO] Scrolling deadline reached with {count} results.")
+            break
 
-        website_href = "No Website"  # Default value
-        # Check if the locator found any elements
-        if website_locator.count() > 0:
-            href = card.first.get_attribute("href")
-            if href:
-                website_href = href
-                print(f"  [SUCCESS] Found website: {website_href}")
-        else:
-            print("  [INFO] No website link found for this business.")
+        feed.evaluate("el => el.scrollBy(0, el.scrollHeight)")
+        print(f"[INFO] Scrolling... ({count}/{max_results})")
+        try:
+            page.wait_for_function(
+                _MORE_CARDS_JS,
+                arg=state_args + [count],
+                polling=100,
+                timeout=min(MAPS_BATCH_WAIT_MS, remaining_ms),
+            )
+            stalled = 0
+        except Exception:
+            stalled += 1
+        if on_batch:
+            on_batch()
+        if stalled >= MAPS_MAX_STALLED_SCROLLS:
+            print(f"[INFO] No new results after {stalled} scrolls, stopping with {count}.")
+            break
 
-        results.append({"name": name, "link": website_href})
-    return results
+    return count
 
 
 def get_leads_from_Maps(
-    query, output_csv="leads.csv", max_results=50, search_for=1
-):  # 0 both, 1 only with websites, 2 only without websites
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True, args=["--no-sandbox"])  # Set to True to hide browser
-        context = browser.new_context(locale="en-US")
-        page = context.new_page()
+    query, output_csv="leads.csv", max_results=50, search_for=1, capture=MAPS_CAPTURE_MODE, viewport=None
+):  # 0 both, 1 only with websites, 2 only without websites; capture "dom" or "network"; viewport (lat, lng, zoom)
+    # Searches run on the Maps worker threads, which own the warm browser sessions
+    return run_on_maps_worker(_search_maps, query, max_results, search_for, capture, viewport)
 
-        print("[INFO] Navigating to Google Maps...")
-        page.goto("https://www.google.com/maps?hl=en", timeout=60000)  # 1 min
 
-        # Optional: Accept consent if shown
-        try:
-            page.click('button:has-text("Accept")', timeout=10000)  # 10 sec
-            print("[INFO] Accepted cookies.")
-        except:
-            print("[INFO] No cookie popup found.")
+def _search_maps(query, max_results, search_for, capture, viewport):
+    session = get_maps_session()
+    with session.page() as page:
+        network = NetworkCapture(page) if capture == "network" else None
 
-        # Wait for search box and input query
-        search_box = page.locator("input#searchboxinput")
-        search_box.wait_for(timeout=10000)  # 10 sec
-        search_box.fill(query)
-        search_box.press("Enter")
+        print("[INFO] Searching Google Maps...")
+        session.open_search(page, query, viewport)
 
         # Wait for the results list to load
         print("[INFO] Waiting for results...")
         try:
-            page.wait_for_selector('div[role="feed"]', timeout=120000)  # 2 min
+            page.wait_for_selector(FEED_SELECTOR, timeout=120000)  # 2 min
             print("[INFO] Results loaded.")
         except:
             print("[ERROR] No results found.")
-            browser.close()
             return []
 
-        # Scroll the results panel to load more businesses
-        scrollable_div = page.locator('div[role="feed"]')
-        for i in range(
-            8
-        ):  ##############################################################################################
-            scrollable_div.evaluate("el => el.scrollBy(0, el.scrollHeight)")
-            print(f"[INFO] Scrolling... ({i+1}/8)")
-            time.sleep(2)
+        # Scroll the results panel until enough businesses are loaded
+        # Only the cards that qualify count towards max_results
+        card_selector = WEBSITE_CARD_SELECTOR if search_for == 1 else PLACE_CARD_SELECTOR
+        without_selector = WEBSITE_CARD_SELECTOR if search_for == 2 else None
+        scroll_feed(
+            page,
+            card_selector,
+            max_results,
+            on_batch=network.collect if network else None,
+            without_selector=without_selector,
+        )
+
+        # Collect business cards
+        cards = harvest_cards(page)
+        if network:
+            network.close()
+            captured = network.results()
+            if captured:
+                print(f"[INFO] Parsed {len(captured)} businesses from {network.responses} search responses.")
+                cards = merge_leads(captured, cards)
+            else:
+                print("[INFO] Could not parse the search responses, using the result cards only.")
+
+        with_website = [card for card in cards if card["website"]]
+        without_website = [card for card in cards if not card["website"]]
+        print(f"[INFO] Found {len(cards)} businesses, {len(with_website)} with a website.")
 
         results1 = []
         results2 = []
-        # Collect business cards
         if search_for == 0 or search_for == 1:
-            business_cards = page.locator('a[data-value="Website"]')  # with website
-            results1 = extract_info(page, business_cards, max_results)
+            results1 = with_website[:max_results]
         if search_for == 0 or search_for == 2:
-            business_cards = page.locator('a[href*="/place/"]')  # without website
-            results2 = extract_info(page, business_cards, max_results)
+            results2 = without_website[:max_results]
 
-        results = combine_results(results1, results2, merge_key="name")
+        results = combine_results(results1, results2, merge_key="place_id")
 
         return results
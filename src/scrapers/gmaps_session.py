@@ -0,0 +1,227 @@
+import atexit
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import quote_plus
+
+from playwright.sync_api import sync_playwright
+
+from src.scrapers.browser_pool import PLAYWRIGHT_START_LOCK
+from src.scrapers.resource_blocking import BLOCKED_RESOURCE_TYPES, TRACKER_DOMAINS, ResourceBlockPolicy
+
+
+# Maps only needs its own scripts and JSON; map tiles, photos and fonts are dead weight
+MAPS_BLOCK_POLICY = ResourceBlockPolicy(BLOCKED_RESOURCE_TYPES, TRACKER_DOMAINS)
+
+# Cookies (including the consent choice) are kept between runs and workers in
+# maps_state.json in the app's instance folder (see use_instance_path), or in
+# MAPS_STORAGE_STATE if set. Until the app is created, the instance folder next
+# to the src package is used, as Flask would pick.
+MAPS_STORAGE_STATE = os.environ.get("MAPS_STORAGE_STATE")
+_DEFAULT_INSTANCE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "instance"
+)
+_storage_state = MAPS_STORAGE_STATE or os.path.join(_DEFAULT_INSTANCE_PATH, "maps_state.json")
+
+# Threads that run the Maps searches; each keeps its warm session for the life of the process
+# (MAPS_TILE_CONCURRENCY is the older name of the setting)
+MAPS_WORKERS = int(os.environ.get("MAPS_WORKERS", os.environ.get("MAPS_TILE_CONCURRENCY", 4)))
+
+# Start a fresh context (from the saved state) after this many searches
+MAPS_SESSION_MAX_SEARCHES = int(os.environ.get("MAPS_SESSION_MAX_SEARCHES", 50))
+
+MAPS_SEARCH_URL = "https://www.google.com/maps/search/{query}{viewport}?hl=en"
+MAPS_NAVIGATION_TIMEOUT_MS = 60000
+CONSENT_TIMEOUT_MS = 10000
+
+CONSENT_HOST = "consent.google."
+CONSENT_ACCEPT_SELECTOR = 'button:has-text("Accept all"), button:has-text("Accept")'
+
+
+def use_instance_path(instance_path):
+    """Keeps the Maps session state in the app's instance folder, unless MAPS_STORAGE_STATE is set."""
+    global _storage_state
+    if not MAPS_STORAGE_STATE:
+        _storage_state = os.path.join(instance_path, "maps_state.json")
+
+
+def search_url(query, viewport=None):
+    """Search URL for `query`, optionally limited to a (lat, lng, zoom) map viewport."""
+    at = ""
+    if viewport:
+        lat, lng, zoom = viewport
+        at = f"/@{lat:.6f},{lng:.6f},{zoom:g}z"
+    return MAPS_SEARCH_URL.format(query=quote_plus(query), viewport=at)
+
+
+class MapsSession:
+    """
+    A warm Chromium and browser context for Google Maps, reused for every
+    search made by a worker thread. The consent choice is stored with
+    storage_state, so the consent page only shows up the first time, and each
+    search navigates straight to its search URL.
+
+    Sync Playwright objects are bound to the thread that created them, so
+    sessions belong to the Maps worker threads: run searches with
+    run_on_maps_worker() and get the worker's session with get_maps_session().
+    """
+
+    def __init__(self, storage_state=None, max_searches=MAPS_SESSION_MAX_SEARCHES):
+        self.storage_state = storage_state if storage_state is not None else _storage_state
+        self.max_searches = max_searches
+
+        self._playwright = None
+        self._browser = None
+        self._context = None
+        self._searches = 0
+
+    def _ensure_context(self):
+        if self._playwright is None:
+            # Keeps this driver out of the crawler pool's process accounting
+            with PLAYWRIGHT_START_LOCK:
+                self._playwright = sync_playwright().start()
+
+        if self._browser is None or not self._browser.is_connected():
+            if self._browser is not None:
+                print("[INFO] Maps browser disconnected, relaunching...")
+            self._browser = self._playwright.chromium.launch(headless=True, args=["--no-sandbox"])
+            self._context = None
+
+        if self._context is None:
+            state = self.storage_state if self.storage_state and os.path.exists(self.storage_state) else None
+            self._context = self._browser.new_context(locale="en-US", storage_state=state)
+            MAPS_BLOCK_POLICY.install(self._context)
+            self._searches = 0
+        return self._context
+
+    def save_state(self):
+        """Writes the context's cookies and local storage to the storage_state file."""
+        if self._context is None or not self.storage_state:
+            return
+        try:
+            directory = os.path.dirname(self.storage_state)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Written atomically: sessions in other threads may be reading it
+            temp_path = f"{self.storage_state}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(self._context.storage_state(), f)
+            os.replace(temp_path, self.storage_state)
+        except Exception as e:
+            print(f"[INFO] Could not save the Maps session state: {e}")
+
+    def _close_context(self):
+        if self._context is not None:
+            self.save_state()
+            try:
+                self._context.close()
+            except Exception:
+                pass
+        self._context = None
+        self._searches = 0
+
+    def accept_consent(self, page):
+        """Accepts Google's consent page if the navigation ended on it. Returns True if it did."""
+        if CONSENT_HOST not in page.url:
+            return False
+        try:
+            page.locator(CONSENT_ACCEPT_SELECTOR).first.click(timeout=CONSENT_TIMEOUT_MS)
+            page.wait_for_url("**/maps/**", timeout=MAPS_NAVIGATION_TIMEOUT_MS)
+        except Exception as e:
+            print(f"[INFO] Could not accept the Google consent page: {e}")
+            return False
+        print("[INFO] Accepted cookies.")
+        self.save_state()
+        return True
+
+    @contextmanager
+    def page(self):
+        """Yields a new page in the warm context and closes it afterwards."""
+        page = self._ensure_context().new_page()
+        try:
+            yield page
+        finally:
+            try:
+                page.close()
+            except Exception:
+                pass
+            self._searches += 1
+            if self.max_searches and self._searches >= self.max_searches:
+                self._close_context()
+
+    def open_search(self, page, query, viewport=None):
+        """Navigates `page` to the Maps results for `query`, passing the consent page if needed."""
+        page.goto(search_url(query, viewport), timeout=MAPS_NAVIGATION_TIMEOUT_MS, wait_until="domcontentloaded")
+        self.accept_consent(page)
+
+    def close(self):
+        self._close_context()
+        if self._browser is not None:
+            try:
+                self._browser.close()
+            except Exception:
+                pass
+            self._browser = None
+        if self._playwright is not None:
+            try:
+                self._playwright.stop()
+            except Exception:
+                pass
+            self._playwright = None
+
+
+_local = threading.local()
+_sessions = []
+_sessions_lock = threading.Lock()
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _mark_worker():
+    _local.is_worker = True
+
+
+def get_maps_executor():
+    """
+    The Maps worker threads. They live as long as the process, so their
+    sessions stay warm between tasks; request threads come and go, and a
+    session started on one would never be reused or closed.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=MAPS_WORKERS, thread_name_prefix="maps-worker", initializer=_mark_worker
+            )
+        return _executor
+
+
+def run_on_maps_worker(fn, *args, **kwargs):
+    """Runs fn on a Maps worker thread (right away if already on one) and returns its result."""
+    if getattr(_local, "is_worker", False):
+        return fn(*args, **kwargs)
+    return get_maps_executor().submit(fn, *args, **kwargs).result()
+
+
+def get_maps_session():
+    """Returns the Maps session of the current worker thread, creating it on first use."""
+    if not getattr(_local, "is_worker", False):
+        raise RuntimeError("Maps sessions only live on the Maps worker threads, see run_on_maps_worker()")
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = MapsSession()
+        _local.session = session
+        with _sessions_lock:
+            _sessions.append(session)
+    return session
+
+
+@atexit.register
+def _shutdown_sessions():
+    with _sessions_lock:
+        for session in _sessions:
+            session.close()
+        _sessions.clear()
@@ -0,0 +1,112 @@
+import math
+import os
+import re
+
+from src.scrapers.gmaps_scraper import FEED_SELECTOR, MAPS_CAPTURE_MODE, get_leads_from_Maps
+from src.scrapers.gmaps_session import MAPS_WORKERS, get_maps_executor, get_maps_session, run_on_maps_worker
+
+
+# Tiles searched at once: one per Maps worker thread, each with its own warm session
+MAPS_TILE_CONCURRENCY = MAPS_WORKERS
+
+# The area of the plain search is split into GRID x GRID tiles
+MAPS_TILE_GRID = int(os.environ.get("MAPS_TILE_GRID", 3))
+
+# A single results feed stops at around 120 places
+MAPS_TILE_MAX_RESULTS = 120
+
+# Browser viewport (Playwright's default) the map zoom levels refer to, in px
+MAPS_VIEWPORT_PX = (1280, 720)
+
+# "/@46.7712101,23.6236353,13z" in a Maps URL: the map center and zoom
+_VIEWPORT_RE = re.compile(r"/@(-?\d+(?:\.\d+)?),(-?\d+(?:\.\d+)?),(\d+(?:\.\d+)?)z")
+
+
+def parse_viewport(url):
+    """(lat, lng, zoom) of a Maps URL, or None if it has no map position."""
+    match = _VIEWPORT_RE.search(url or "")
+    if not match:
+        return None
+    return float(match.group(1)), float(match.group(2)), float(match.group(3))
+
+
+def grid_viewports(viewport, grid=MAPS_TILE_GRID):
+    """
+    Splits a map viewport into grid x grid smaller viewports covering the same
+    area, zoomed in so that each one shows a single tile.
+    """
+    lat, lng, zoom = viewport
+    if grid <= 1:
+        return [viewport]
+
+    # Degrees per pixel at this zoom (Web Mercator, 256 px world tiles)
+    lng_per_px = 360 / (256 * 2 ** zoom)
+    lat_per_px = lng_per_px * math.cos(math.radians(lat))
+    width, height = MAPS_VIEWPORT_PX[0] * lng_per_px, MAPS_VIEWPORT_PX[1] * lat_per_px
+    tile_zoom = round(zoom + math.log2(grid), 2)
+
+    viewports = []
+    for row in range(grid):
+        for column in range(grid):
+            tile_lat = lat + height * (0.5 - (row + 0.5) / grid)
+            tile_lng = lng + width * ((column + 0.5) / grid - 0.5)
+            viewports.append((round(tile_lat, 6), round(tile_lng, 6), tile_zoom))
+    return viewports
+
+
+def find_viewport(query):
+    """Runs the plain search once and returns the map position Maps chose for it, or None."""
+    session = get_maps_session()
+    with session.page() as page:
+        session.open_search(page, query)
+        try:
+            page.wait_for_selector(FEED_SELECTOR, timeout=60000)
+            page.wait_for_url(_VIEWPORT_RE, timeout=10000)
+        except Exception:
+            pass
+        return parse_viewport(page.url)
+
+
+def plan_tiles(query, areas=None, grid=MAPS_TILE_GRID):
+    """
+    The (query, viewport) searches a tiled search is made of: one sub-query per
+    area when areas are given ("dentist" + "Marasti" -> "dentist Marasti"),
+    otherwise the plain query over a grid of viewports.
+    """
+    if areas:
+        return [(f"{query} {area}", None) for area in areas]
+
+    viewport = run_on_maps_worker(find_viewport, query)
+    if viewport is None:
+        print("[INFO] Could not find the map area of the search, running it as a single tile.")
+        return [(query, None)]
+    return [(query, tile) for tile in grid_viewports(viewport, grid)]
+
+
+def tiled_search(query, max_results=500, search_for=1, areas=None, grid=MAPS_TILE_GRID, capture=MAPS_CAPTURE_MODE):
+    """
+    Covers more than one results feed can hold: the search is split into tiles
+    (see plan_tiles) that run concurrently on MAPS_TILE_CONCURRENCY workers,
+    and places are de-duplicated by place id across tiles. Returns leads in the
+    same format as get_leads_from_Maps.
+    """
+    tiles = plan_tiles(query, areas, grid)
+    print(f"[INFO] Searching {len(tiles)} tiles, {MAPS_TILE_CONCURRENCY} at a time...")
+
+    def search_tile(tile):
+        tile_query, viewport = tile
+        try:
+            return get_leads_from_Maps(
+                tile_query, max_results=MAPS_TILE_MAX_RESULTS, search_for=search_for, capture=capture, viewport=viewport
+            )
+        except Exception as e:
+            print(f"[INFO] Tile search failed for {tile_query} {viewport or ''}: {e}")
+            return []
+
+    leads = {}
+    for tile_leads in get_maps_executor().map(search_tile, tiles):
+        for lead in tile_leads:
+            leads.setdefault(lead.get("place_id") or lead["name"], lead)
+
+    print(f"[INFO] Found {len(leads)} unique businesses across {len(tiles)} tiles.")
+    return list(leads.values())[:max_results]
@@ -0,0 +1,93 @@
+import re
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.scrapers.page_cache import PAGE_CACHE
+from src.utils.host_health import HOST_HEALTH
+
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+
+HTTP_TIMEOUT = 10
+
+_META_CHARSET_RE = re.compile(rb"""<meta[^>]+charset=["']?([\w-]+)""", re.IGNORECASE)
+
+_local = threading.local()
+
+
+def get_session():
+    """
+    Returns the pooled requests.Session for the current thread. Sessions are not
+    guaranteed thread-safe, so every worker thread keeps its own connection pool.
+    """
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update({
+            "User-Agent": USER_AGENT,
+            "Accept": "text/html,application/xhtml+xml;q=0.9,*/*;q=0.8",
+            "Accept-Language": "en-US,en;q=0.9,ro;q=0.8",
+        })
+        _local.session = session
+    return session
+
+
+def decode_response(resp):
+    """
+    Decodes an HTML response body. When the server sends no charset we look for a
+    <meta charset> before falling back to UTF-8, instead of requests' ISO-8859-1.
+    """
+    content_type = resp.headers.get("Content-Type", "")
+    if "charset" not in content_type.lower():
+        match = _META_CHARSET_RE.search(resp.content[:4096])
+        resp.encoding = match.group(1).decode("ascii", "ignore") if match else "utf-8"
+    try:
+        return resp.text
+    except LookupError:
+        # Unknown charset name in the page
+        return resp.content.decode("utf-8", errors="replace")
+
+
+def fetch_html(url, timeout=HTTP_TIMEOUT):
+    """
+    Fetches a page over plain HTTP with the pooled session, going through the
+    page cache: fresh entries are served from disk, stale ones are revalidated
+    with a conditional request. Returns the HTML, or None if the request failed
+    or the body is not HTML.
+    """
+    entry = PAGE_CACHE.get(url)
+    if entry is not None and PAGE_CACHE.is_fresh(entry):
+        PAGE_CACHE.record_hit()
+        return entry["html"]
+
+    try:
+        resp = HOST_HEALTH.request(
+            "GET", url, timeout, session=get_session(), headers=PAGE_CACHE.conditional_headers(entry)
+        )
+        if resp.status_code == 304 and entry is not None:
+            PAGE_CACHE.mark_revalidated(url, entry)
+            return entry["html"]
+        resp.raise_for_status()
+    except requests.RequestException as e:
+        print(f"  -> HTTP fetch failed for {url}: {e}")
+        if entry is not None:
+            print("  -> Using stale cached copy")
+            return entry["html"]
+        return None
+
+    content_type = resp.headers.get("Content-Type", "").lower()
+    if content_type and "html" not in content_type:
+        return None
+
+    html = decode_response(resp)
+    if not html.strip():  # skip empty pages
+        return None
+
+    PAGE_CACHE.record_miss()
+    PAGE_CACHE.put(url, html, etag=resp.headers.get("ETag"), last_modified=resp.headers.get("Last-Modified"))
+    return html
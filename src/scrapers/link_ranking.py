@@ -0,0 +1,120 @@
+import re
+from urllib.parse import urlparse, urlunparse
+
+
+# Stems for contextual pages (partial matching on the URL path)
+CONTEXT_STEMS = [
+    "about", "team", "mission", "vision", "leader", "story", "what-we-do",
+    "service", "despre", "echipa", "cariera", "oferte", "produse", "pretur",
+    "servicii"
+]
+
+# Stems for contact pages (used for email prioritization)
+CONTACT_STEMS = ["contact", "get-in-touch", "getintouch"]
+
+# Combine all unique stems for the scraping loop
+ALL_STEMS = list(dict.fromkeys(CONTEXT_STEMS + CONTACT_STEMS))
+
+# Lower tier is crawled first. Language variants share the tier of their
+# English counterpart (despre ~ about, echipa ~ team, produse ~ service, ...).
+STEM_TIERS = {
+    "contact": 0, "get-in-touch": 0, "getintouch": 0,
+    "about": 1, "despre": 1,
+    "team": 2, "echipa": 2, "what-we-do": 2, "service": 2, "servicii": 2, "produse": 2, "oferte": 2,
+    "mission": 3, "vision": 3, "story": 3, "leader": 3, "pretur": 3,
+    "cariera": 4,
+}
+
+# One pass over the path finds every stem at the start of a path segment.
+# Longer stems go first so "getintouch" is never shadowed by a shorter prefix.
+STEM_PATTERN = re.compile(
+    "/(" + "|".join(re.escape(stem) for stem in sorted(ALL_STEMS, key=len, reverse=True)) + ")"
+)
+
+# Links to these are never HTML pages worth crawling
+SKIPPED_EXTENSIONS = (
+    ".pdf", ".jpg", ".jpeg", ".png", ".gif", ".webp", ".svg", ".zip", ".rar",
+    ".doc", ".docx", ".xls", ".xlsx", ".ppt", ".pptx", ".mp4", ".mp3",
+)
+
+
+def url_key(url):
+    """
+    Identity of a page for de-duplication: host without "www.", path without
+    trailing slash. Scheme, query string and fragment are ignored.
+    """
+    parsed = urlparse(url)
+    host = (parsed.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    return host + (parsed.path.rstrip("/") or "/")
+
+
+def clean_url(url):
+    """Drops the fragment, which never changes the page the server returns."""
+    return urlunparse(urlparse(url)._replace(fragment=""))
+
+
+def _variant_preference(url):
+    # Prefer the plain URL of a page: no query string, https
+    parsed = urlparse(url)
+    return (bool(parsed.query), parsed.scheme != "https", len(url))
+
+
+def match_stems(url):
+    """Returns the stems found in the URL path, most important first."""
+    path = urlparse(url).path.lower()
+    stems = dict.fromkeys(match.group(1) for match in STEM_PATTERN.finditer(path))
+    return sorted(stems, key=lambda stem: STEM_TIERS.get(stem, len(STEM_TIERS)))
+
+
+def score_link(url, stem):
+    """
+    Sort key of a candidate: stem tier, then path depth and length (shallow
+    pages like /contact beat /blog/2019/contact-us-for-offers), then the URL
+    itself so the order never depends on the input order.
+    """
+    path = urlparse(url).path.rstrip("/")
+    depth = len([segment for segment in path.split("/") if segment])
+    return (STEM_TIERS.get(stem, len(STEM_TIERS)), depth, len(path), url)
+
+
+def rank_links(candidate_links):
+    """
+    De-duplicates URL variants and returns (stem, url) pairs for every link
+    whose path matches a stem, best first. A link matching several stems is
+    listed once per stem.
+    """
+    variants = {}
+    for url in candidate_links:
+        if urlparse(url).path.lower().endswith(SKIPPED_EXTENSIONS):
+            continue
+        url = clean_url(url)
+        key = url_key(url)
+        if key not in variants or _variant_preference(url) < _variant_preference(variants[key]):
+            variants[key] = url
+
+    ranked = [(stem, url) for url in variants.values() for stem in match_stems(url)]
+    ranked.sort(key=lambda pair: score_link(pair[1], pair[0]))
+    return ranked
+
+
+def plan_crawl(candidate_links, found_pages, max_pages):
+    """
+    Builds the ordered crawl plan: the best URL for each stem that has not
+    been scraped yet, most important stems first, each URL visited at most
+    once, bounded by the remaining page budget. Returns (stem, url) tuples.
+    """
+    plan = []
+    planned_stems = set(found_pages)
+    planned_urls = set()
+    for stem, url in rank_links(candidate_links):
+        if len(found_pages) + len(plan) >= max_pages:
+            print("Reached max pages limit")
+            break
+        if stem in planned_stems or url in planned_urls:
+            continue
+        planned_stems.add(stem)
+        planned_urls.add(url)
+        plan.append((stem, url))
+    return plan
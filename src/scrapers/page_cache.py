@@ -0,0 +1,228 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+
+
+PAGE_CACHE_ENABLED = os.environ.get("PAGE_CACHE_ENABLED", "1") != "0"
+# Set PAGE_CACHE_DIR to keep the cache elsewhere. By default it lives in the
+# app's instance folder (see use_instance_path); until the app is created,
+# the instance folder next to the src package, as Flask would pick.
+PAGE_CACHE_DIR = os.environ.get("PAGE_CACHE_DIR")
+_DEFAULT_INSTANCE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "instance"
+)
+
+# Entries younger than the TTL are served without touching the network; older
+# ones are revalidated with a conditional request when we have validators.
+PAGE_CACHE_TTL = int(os.environ.get("PAGE_CACHE_TTL", 24 * 3600))
+
+# When the cache grows past this size, the least recently used entries are
+# removed until it is back under PAGE_CACHE_TARGET_RATIO of the limit.
+PAGE_CACHE_MAX_MB = int(os.environ.get("PAGE_CACHE_MAX_MB", 500))
+PAGE_CACHE_TARGET_RATIO = 0.9
+
+
+def normalize_url(url):
+    """
+    Cache identity of a URL: lowercase scheme and host, no default port, no
+    fragment, no trailing slash, sorted query parameters.
+    """
+    parsed = urlparse(url.strip())
+    scheme = parsed.scheme.lower() or "http"
+    host = (parsed.hostname or "").lower()
+    if parsed.port and parsed.port not in (80, 443):
+        host = f"{host}:{parsed.port}"
+    path = parsed.path.rstrip("/") or "/"
+    query = urlencode(sorted(parse_qsl(parsed.query, keep_blank_values=True)))
+    return urlunparse((scheme, host, path, "", query, ""))
+
+
+def cache_key(url):
+    return hashlib.sha256(normalize_url(url).encode("utf-8")).hexdigest()
+
+
+class PageCache:
+    """
+    On-disk page cache shared by all workers on a machine. One gzipped JSON
+    file per page, named by the SHA-256 of the normalised URL, holding:
+
+    - url, html, text (the extracted page text, if known)
+    - etag, last_modified: validators for conditional revalidation
+    - fetched_at: when the page was last fetched or revalidated
+    - rendered: True when the HTML comes from the browser, not plain HTTP
+
+    Files are written atomically, so concurrent workers never read half an
+    entry. File mtimes double as "last used" for the LRU eviction.
+    """
+
+    def __init__(self, directory=PAGE_CACHE_DIR, ttl=PAGE_CACHE_TTL, max_mb=PAGE_CACHE_MAX_MB, enabled=PAGE_CACHE_ENABLED):
+        self.directory = directory or os.path.join(_DEFAULT_INSTANCE_PATH, "page_cache")
+        self.ttl = ttl
+        self.max_bytes = max_mb * 1024 * 1024
+        self.enabled = enabled
+
+        self._lock = threading.Lock()
+        self._total_bytes = None  # Computed on the first write
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    def use_instance_path(self, instance_path):
+        """Moves the cache into the app's instance folder, unless PAGE_CACHE_DIR is set."""
+        if PAGE_CACHE_DIR:
+            return
+        with self._lock:
+            self.directory = os.path.join(instance_path, "page_cache")
+            self._total_bytes = None
+
+    def _path(self, url):
+        key = cache_key(url)
+        return os.path.join(self.directory, key[:2], key + ".json.gz")
+
+    def get(self, url):
+        """Returns the cached entry for a URL regardless of its age, or None."""
+        if not self.enabled:
+            return None
+        path = self._path(url)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                entry = json.load(f)
+            os.utime(path)  # Mark as recently used
+        except (OSError, ValueError):
+            return None
+        return entry
+
+    def is_fresh(self, entry):
+        return time.time() - entry.get("fetched_at", 0) < self.ttl
+
+    def get_fresh(self, url):
+        """Returns the cached entry only if it is still within the TTL."""
+        entry = self.get(url)
+        if entry is not None and self.is_fresh(entry):
+            self.record_hit()
+            return entry
+        return None
+
+    def conditional_headers(self, entry):
+        """Request headers that let the server answer 304 Not Modified."""
+        headers = {}
+        if entry is None or entry.get("rendered"):
+            return headers
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def put(self, url, html, text=None, etag=None, last_modified=None, rendered=False):
+        """Stores a freshly fetched page."""
+        if not self.enabled:
+            return
+        self._write(url, {
+            "url": url,
+            "html": html,
+            "text": text,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": time.time(),
+            "rendered": rendered,
+        })
+
+    def set_text(self, url, text):
+        """Adds the extracted text to an existing entry."""
+        entry = self.get(url)
+        if entry is not None and entry.get("text") != text:
+            entry["text"] = text
+            self._write(url, entry)
+
+    def mark_revalidated(self, url, entry):
+        """Restarts the TTL of an entry after a 304 Not Modified."""
+        with self._lock:
+            self.revalidated += 1
+        entry["fetched_at"] = time.time()
+        self._write(url, entry)
+
+    def record_hit(self):
+        with self._lock:
+            self.hits += 1
+
+    def record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def _write(self, url, entry):
+        path = self._path(url)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+                json.dump(entry, f)
+            try:
+                # Overwriting an entry (set_text, mark_revalidated) only adds the difference
+                old_size = os.path.getsize(path)
+            except OSError:
+                old_size = 0
+            os.replace(tmp_path, path)
+            size = os.path.getsize(path) - old_size
+        except OSError as e:
+            print(f"  -> Could not write page cache entry for {url}: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = self._disk_usage()
+            else:
+                self._total_bytes += size
+            over_limit = self.max_bytes and self._total_bytes > self.max_bytes
+        if over_limit:
+            self.evict()
+
+    def _entries(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".json.gz"):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    yield stat.st_mtime, stat.st_size, path
+
+    def _disk_usage(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self):
+        """Removes the least recently used entries until the cache is under its target size."""
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            target = self.max_bytes * PAGE_CACHE_TARGET_RATIO
+            removed = 0
+            for _, size, path in entries:
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                removed += 1
+            self._total_bytes = total
+        if removed:
+            print(f"[INFO] Page cache: evicted {removed} entries, {total / 1024 / 1024:.0f} MB left.")
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "revalidated": self.revalidated, "misses": self.misses}
+
+
+# Shared cache for all crawls in this worker
+PAGE_CACHE = PageCache()
@@ -0,0 +1,84 @@
+import os
+import time
+
+
+# "event" waits for the page to actually be ready; "fixed" keeps the old fixed sleeps.
+PAGE_READINESS_MODE = os.environ.get("PAGE_READINESS_MODE", "event")
+
+# Hard cap for one readiness wait, cap for the network-idle phase, and how long
+# the DOM has to stay unchanged to count as stable (all in ms).
+READY_DEADLINE_MS = 5000
+NETWORK_IDLE_MAX_MS = 2000
+DOM_QUIET_MS = 200
+
+# Event-mode waits end after this multiple of the fixed sleep they replace
+SETTLE_MAX_FACTOR = 2
+
+# Resolves true once no nodes have been added or removed for `quietMs`, or false
+# at `maxMs`. Attribute and text changes are ignored: carousels, tickers and
+# animations change them forever without the page's content changing.
+_DOM_STABLE_JS = """
+([quietMs, maxMs]) => new Promise(resolve => {
+    const root = document.documentElement || document;
+    let quietTimer = null;
+    let hardTimer = null;
+    const finish = (stable) => {
+        observer.disconnect();
+        clearTimeout(quietTimer);
+        clearTimeout(hardTimer);
+        resolve(stable);
+    };
+    const observer = new MutationObserver(() => {
+        clearTimeout(quietTimer);
+        quietTimer = setTimeout(() => finish(true), quietMs);
+    });
+    observer.observe(root, {childList: true, subtree: true});
+    quietTimer = setTimeout(() => finish(true), quietMs);
+    hardTimer = setTimeout(() => finish(false), maxMs);
+})
+"""
+
+
+def _remaining_ms(start, deadline_ms):
+    return max(0, deadline_ms - (time.monotonic() - start) * 1000)
+
+
+async def wait_until_ready(page, deadline_ms=READY_DEADLINE_MS):
+    """
+    Waits until the page is usable: DOM content loaded, network quiet, and the
+    DOM no longer changing, all within `deadline_ms`. Returns True if the page
+    settled before the deadline.
+    """
+    start = time.monotonic()
+    try:
+        await page.wait_for_load_state("domcontentloaded", timeout=_remaining_ms(start, deadline_ms))
+    except Exception:
+        return False
+
+    try:
+        await page.wait_for_load_state(
+            "networkidle", timeout=min(NETWORK_IDLE_MAX_MS, _remaining_ms(start, deadline_ms))
+        )
+    except Exception:
+        pass  # Long-polling and analytics beacons can keep the network busy forever
+
+    remaining = _remaining_ms(start, deadline_ms)
+    if remaining <= DOM_QUIET_MS:
+        return False
+    try:
+        return await page.evaluate(_DOM_STABLE_JS, [DOM_QUIET_MS, int(remaining)])
+    except Exception:
+        # Navigations during the check destroy the execution context
+        return False
+
+
+async def settle(page, fixed_ms, mode=None, deadline_ms=READY_DEADLINE_MS):
+    """
+    Replacement for page.wait_for_timeout(fixed_ms): sleeps for `fixed_ms` in
+    "fixed" mode, otherwise waits only as long as the page needs, and at most
+    SETTLE_MAX_FACTOR times `fixed_ms`. Never waits longer than `deadline_ms`.
+    """
+    if (mode or PAGE_READINESS_MODE) == "fixed":
+        await page.wait_for_timeout(min(fixed_ms, deadline_ms))
+    else:
+        await wait_until_ready(page, min(deadline_ms, fixed_ms * SETTLE_MAX_FACTOR))
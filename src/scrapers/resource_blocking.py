@@ -0,0 +1,124 @@
+import os
+import threading
+from collections import Counter
+from urllib.parse import urlparse
+
+
+# We only ever read page.content(), so these never need to be downloaded.
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font"}
+
+# Analytics, ads, chat widgets and embeds commonly found on small-business sites.
+# Matching is by host suffix, so "googletagmanager.com" also blocks "www.googletagmanager.com".
+TRACKER_DOMAINS = {
+    # Analytics / tag managers
+    "google-analytics.com", "googletagmanager.com", "analytics.google.com",
+    "hotjar.com", "clarity.ms", "mixpanel.com", "segment.io", "segment.com",
+    "mc.yandex.ru", "matomo.cloud", "newrelic.com", "nr-data.net",
+    # Ads / social pixels
+    "doubleclick.net", "googlesyndication.com", "googleadservices.com",
+    "adservice.google.com", "facebook.net", "connect.facebook.net",
+    "analytics.tiktok.com", "snap.licdn.com", "ads.linkedin.com",
+    "criteo.com", "criteo.net", "taboola.com", "outbrain.com", "bat.bing.com",
+    # Chat widgets
+    "tawk.to", "embed.tawk.to", "intercom.io", "intercomcdn.com", "crisp.chat",
+    "smartsupp.com", "livechatinc.com", "zopim.com", "drift.com", "hubspot.com",
+    "hs-scripts.com", "hs-analytics.net", "onesignal.com",
+    # Video / map embeds
+    "youtube.com", "youtube-nocookie.com", "ytimg.com", "vimeo.com", "vimeocdn.com",
+}
+
+CRAWL_BLOCK_RESOURCES = os.environ.get("CRAWL_BLOCK_RESOURCES", "1") != "0"
+
+
+def _host_matches(host, domains):
+    """True if the host or any of its parent domains is in `domains`."""
+    labels = host.split(".")
+    return any(".".join(labels[i:]) in domains for i in range(len(labels) - 1))
+
+
+class ResourceBlockPolicy:
+    """
+    Aborts requests by resource type or by tracker domain on every context it is
+    installed on, and keeps counters of what was blocked. Blocked responses are
+    never downloaded, so their size is unknown; `allowed_bytes` (from
+    Content-Length) shows what the pages still transfer.
+    """
+
+    def __init__(self, resource_types=BLOCKED_RESOURCE_TYPES, blocked_domains=TRACKER_DOMAINS, enabled=CRAWL_BLOCK_RESOURCES):
+        self.resource_types = set(resource_types)
+        self.blocked_domains = set(blocked_domains)
+        self.enabled = enabled
+
+        self._lock = threading.Lock()
+        self._blocked_by_type = Counter()
+        self._blocked_by_domain = Counter()
+        self._allowed_requests = 0
+        self._allowed_bytes = 0
+
+    def block_reason(self, resource_type, url):
+        """Returns why a request should be blocked, or None to let it through."""
+        if resource_type in self.resource_types:
+            return "type"
+        host = (urlparse(url).hostname or "").lower()
+        if host and _host_matches(host, self.blocked_domains):
+            return "domain"
+        return None
+
+    def _should_block(self, request):
+        reason = self.block_reason(request.resource_type, request.url)
+        with self._lock:
+            if reason is None:
+                self._allowed_requests += 1
+                return False
+            self._blocked_by_type[request.resource_type] += 1
+            if reason == "domain":
+                self._blocked_by_domain[urlparse(request.url).hostname] += 1
+        return True
+
+    def _on_response(self, response):
+        try:
+            length = int(response.headers.get("content-length", 0))
+        except (TypeError, ValueError):
+            return
+        with self._lock:
+            self._allowed_bytes += length
+
+    def _handle_route(self, route):
+        if self._should_block(route.request):
+            route.abort()
+        else:
+            route.continue_()
+
+    async def _handle_route_async(self, route):
+        if self._should_block(route.request):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    def install(self, context):
+        """Applies the policy to a sync Playwright BrowserContext."""
+        if not self.enabled:
+            return
+        context.route("**/*", self._handle_route)
+        context.on("response", self._on_response)
+
+    async def install_async(self, context):
+        """Applies the policy to an async Playwright BrowserContext."""
+        if not self.enabled:
+            return
+        await context.route("**/*", self._handle_route_async)
+        context.on("response", self._on_response)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "blocked_requests": sum(self._blocked_by_type.values()),
+                "blocked_by_type": dict(self._blocked_by_type),
+                "blocked_by_domain": dict(self._blocked_by_domain.most_common(20)),
+                "allowed_requests": self._allowed_requests,
+                "allowed_bytes": self._allowed_bytes,
+            }
+
+
+# Shared policy for all website crawls in this worker
+CRAWL_BLOCK_POLICY = ResourceBlockPolicy()
@@ -0,0 +1,163 @@
+import os
+import zlib
+from urllib.parse import urljoin
+
+import requests
+from lxml import etree
+
+from src.scrapers.crawl_budget import CrawlBudget
+from src.scrapers.domains import InternalLinkClassifier
+from src.scrapers.http_fetcher import HTTP_TIMEOUT, get_session
+from src.scrapers.link_ranking import match_stems
+from src.utils.host_health import HOST_HEALTH
+
+
+SITEMAP_DISCOVERY = os.environ.get("SITEMAP_DISCOVERY", "1") != "0"
+
+# Caps per site: sitemap files fetched, and <loc> entries read across all of them
+SITEMAP_MAX_FILES = int(os.environ.get("SITEMAP_MAX_FILES", 5))
+SITEMAP_MAX_URLS = int(os.environ.get("SITEMAP_MAX_URLS", 5000))
+
+# Tried in order when robots.txt does not declare any sitemap
+DEFAULT_SITEMAP_PATHS = ["/sitemap.xml", "/sitemap_index.xml"]
+
+# In a sitemap index, child sitemaps of static pages are read before posts/products
+_CHILD_SITEMAP_HINTS = ("page", "pagin", "main", "general")
+
+_GZIP_MAGIC = b"\x1f\x8b"
+
+
+class SitemapDiscovery:
+    """
+    What the sitemaps of a site revealed:
+
+    - urls: same-site page URLs whose path matches a page stem, in sitemap order
+    - sitemaps_read: number of sitemap files parsed
+    - urls_seen: total <loc> page entries read
+    """
+
+    def __init__(self):
+        self.urls = []
+        self.sitemaps_read = 0
+        self.urls_seen = 0
+
+    @property
+    def nothing_relevant(self):
+        """True when the site has a readable sitemap but none of its pages match a stem."""
+        return self.urls_seen > 0 and not self.urls
+
+
+def sitemaps_from_robots(start_url, timeout=HTTP_TIMEOUT):
+    """Returns the sitemap URLs declared in robots.txt, or an empty list."""
+    try:
+        resp = HOST_HEALTH.request("GET", urljoin(start_url, "/robots.txt"), timeout, session=get_session())
+        if resp.status_code != 200:
+            return []
+        robots = resp.text
+    except requests.RequestException:
+        return []
+
+    sitemaps = []
+    for line in robots.splitlines():
+        key, _, value = line.partition(":")
+        if key.strip().lower() == "sitemap" and value.strip():
+            sitemaps.append(urljoin(start_url, value.strip()))
+    return list(dict.fromkeys(sitemaps))
+
+
+def _body_chunks(resp):
+    """Response body in chunks, transparently gunzipping .xml.gz files."""
+    decompressor = None
+    for chunk in resp.iter_content(chunk_size=64 * 1024):
+        if decompressor is None:
+            # 16 + MAX_WBITS: gzip container
+            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS) if chunk[:2] == _GZIP_MAGIC else False
+        yield decompressor.decompress(chunk) if decompressor else chunk
+
+
+def iter_sitemap(url, timeout=HTTP_TIMEOUT):
+    """
+    Stream-parses one sitemap or sitemap index and yields ("sitemap", loc) for
+    child sitemaps and ("url", loc) for pages. The document is never held in
+    memory as a whole; parsed elements are discarded as we go.
+    """
+    try:
+        resp = HOST_HEALTH.request("GET", url, timeout, session=get_session(), stream=True)
+    except requests.RequestException as e:
+        print(f"  -> Could not fetch sitemap {url}: {e}")
+        return
+
+    with resp:
+        if resp.status_code != 200:
+            return
+        parser = etree.XMLPullParser(
+            events=("end",), tag=("{*}sitemap", "{*}url"), recover=True, resolve_entities=False
+        )
+        try:
+            for chunk in _body_chunks(resp):
+                parser.feed(chunk)
+                for _, element in parser.read_events():
+                    loc = element.findtext("{*}loc")
+                    kind = "sitemap" if etree.QName(element).localname == "sitemap" else "url"
+                    element.clear()
+                    while element.getprevious() is not None:
+                        del element.getparent()[0]
+                    if loc and loc.strip():
+                        yield kind, loc.strip()
+        except (etree.XMLSyntaxError, zlib.error, requests.RequestException) as e:
+            print(f"  -> Could not parse sitemap {url}: {e}")
+
+
+def discover_pages(start_url, max_files=SITEMAP_MAX_FILES, max_urls=SITEMAP_MAX_URLS, budget=None):
+    """
+    Finds candidate subpages of a site from robots.txt and its sitemaps, over
+    plain HTTP only. Sitemap indexes are followed (page sitemaps first) up to
+    `max_files` files and `max_urls` page entries, within the crawl budget.
+    """
+    discovery = SitemapDiscovery()
+    if not SITEMAP_DISCOVERY:
+        return discovery
+
+    budget = budget or CrawlBudget()
+    classifier = InternalLinkClassifier(start_url)
+    queue = sitemaps_from_robots(start_url, timeout=budget.timeout_s(HTTP_TIMEOUT))
+    queue = queue or [urljoin(start_url, path) for path in DEFAULT_SITEMAP_PATHS]
+    visited = set()
+    found = {}
+
+    while queue and discovery.sitemaps_read < max_files and discovery.urls_seen < max_urls:
+        if budget.exhausted():
+            break
+        sitemap_url = queue.pop(0)
+        if sitemap_url in visited:
+            continue
+        visited.add(sitemap_url)
+
+        children = []
+        entries = 0
+        for kind, loc in iter_sitemap(sitemap_url, timeout=budget.timeout_s(HTTP_TIMEOUT)):
+            entries += 1
+            if kind == "sitemap":
+                children.append(loc)
+                continue
+            discovery.urls_seen += 1
+            if classifier.is_internal(loc) and match_stems(loc):
+                found.setdefault(loc, None)
+            if discovery.urls_seen >= max_urls:
+                break
+        if entries:
+            discovery.sitemaps_read += 1
+            # Only fall back to the next default path when this one was missing
+            if sitemap_url.endswith(tuple(DEFAULT_SITEMAP_PATHS)):
+                queue = [url for url in queue if not url.endswith(tuple(DEFAULT_SITEMAP_PATHS))]
+
+        children.sort(key=lambda loc: not any(hint in loc.lower() for hint in _CHILD_SITEMAP_HINTS))
+        queue.extend(children)
+
+    discovery.urls = list(found)
+    if discovery.sitemaps_read:
+        print(
+            f"  -> Sitemap: {discovery.urls_seen} pages in {discovery.sitemaps_read} files, "
+            f"{len(discovery.urls)} relevant"
+        )
+    return discovery
@@ -1,42 +1,46 @@
+import asyncio
+import os
 import re
-from urllib.parse import urljoin, urlparse
+from contextlib import AsyncExitStack
 
-import requests
-import tldextract
-from bs4 import BeautifulSoup
-from readability import Document
-
-from playwright.sync_api import sync_playwright
-import re
+from src.scrapers.boilerplate import strip_boilerplate
+from src.scrapers.browser_pool import get_browser_pool, run_on_crawler_loop
+from src.scrapers.consent import dismiss_consent
+from src.scrapers.crawl_budget import CrawlBudget
+from src.scrapers.domains import InternalLinkClassifier
+from src.scrapers.email_extractor import EmailRanker
+from src.scrapers.extraction import parse_page
+from src.scrapers.link_ranking import CONTACT_STEMS, match_stems, plan_crawl
+from src.scrapers.http_fetcher import HTTP_TIMEOUT, USER_AGENT, fetch_html
+from src.scrapers.page_cache import PAGE_CACHE
+from src.scrapers.page_readiness import READY_DEADLINE_MS, settle
+from src.scrapers.sitemap import discover_pages
+from src.utils.host_health import HOST_HEALTH
 
 
 
 def is_valid_internal_link(base_url, link):
-    if not link:
-        return False
-    if link.startswith("#") or link.startswith("mailto:") or link.startswith("tel:"):
-        return False
-    parsed_link = urlparse(urljoin(base_url, link))
-    base_domain = tldextract.extract(base_url).domain
-    link_domain = tldextract.extract(parsed_link.netloc).domain
-    return base_domain == link_domain
+    return InternalLinkClassifier(base_url).is_internal(link)
 
 
 def get_readable_text(url):
     print(f"  -> Scraping full text from: {url}")
-    try:
-        resp = requests.get(url, headers={"User-Agent": "Mozilla/5.0"}, timeout=10)
-        resp.raise_for_status()
-        if not resp.text.strip():  # skip empty pages
-            print("  -> Page is empty, skipping.")
-            return None
-    except requests.RequestException:
+    # Only a fresh entry that already has the text counts as a hit here;
+    # otherwise fetch_html reads the entry again and counts it itself
+    cached = PAGE_CACHE.get(url)
+    if cached and cached.get("text") and PAGE_CACHE.is_fresh(cached):
+        PAGE_CACHE.record_hit()
+        return cached["text"]
+
+    html = fetch_html(url)
+    if html is None:
+        print("  -> Page is empty or unreachable, skipping.")
         return None
 
     try:
-        doc = Document(resp.text)
-        soup = BeautifulSoup(doc.summary(), "html.parser")
-        return soup.get_text(separator="\n", strip=True)
+        text = extract_page_text(html)
+        PAGE_CACHE.set_text(url, text)
+        return text
     except Exception as e:
         print(f"  -> Could not parse page with readability: {e}")
         return None
@@ -263,354 +267,346 @@ def is_blank_or_low_content(text: str) -> bool:
         
 #     return {"pages": found_pages, "email": first_email}
 
-def crawl_website(start_url, keywords=None, max_pages=10):
+
+# Max subpages of a single site fetched at once (HTTP requests or browser tabs)
+SUBPAGE_CONCURRENCY = int(os.environ.get("SUBPAGE_CONCURRENCY", 4))
+
+
+def extract_page_text(html, fallback=False):
     """
-    Crawls a website using Playwright, extracts text from relevant pages,
-    and finds the first email address, prioritizing the contact page email,
-    using partial matching on URL path stems.
+    Extracts readable text from a page with Readability. With fallback=True,
+    falls back to the <main>/<body> text when Readability gets too little.
     """
-    
-    # 1. SIMPLIFIED STEMS FOR CONTEXTUAL PAGES (Partial Matching)
-    CONTEXT_STEMS = [
-        "about", "team", "mission", "vision", "leader", "story", "what-we-do",
-        "service", "despre", "echipa", "cariera", "oferte", "produse", "pretur"
-    ]
-    
-    # 2. SIMPLIFIED STEMS FOR CONTACT PAGES (for email prioritization)
-    CONTACT_STEMS = ["contact", "get-in-touch", "getintouch"]
-    
-    # Combine all unique stems for the scraping loop
-    ALL_STEMS = list(set(CONTEXT_STEMS + CONTACT_STEMS))
+    return parse_page(html, "", fallback=fallback).text
+
+
+def find_candidate_links(parsed_page, start_url):
+    """Returns the internal links found on a parsed page, in document order."""
+    classifier = InternalLinkClassifier(start_url)
+    return list(dict.fromkeys(classifier.filter(parsed_page.links)))
+
+
+def match_stem(url, found_pages):
+    """Returns the most important stem matching the URL path that has not been scraped yet."""
+    for stem in match_stems(url):
+        if stem not in found_pages:
+            return stem
+    return None
+
+
+def plan_subpages(candidate_links, found_pages, max_pages):
+    """
+    Picks the best URL for each stem that has not been scraped yet, contact
+    pages first, bounded by the remaining page budget. Returns a list of
+    (stem, url) tuples in a deterministic order.
+    """
+    return plan_crawl(candidate_links, found_pages, max_pages)
+
+
+def fetch_static_page(url, fallback=False, budget=None):
+    """
+    HTTP tier of the fetcher. Returns the ParsedPage of the plain HTML, or None
+    if it could not be fetched. When the page is an empty JS shell / too thin,
+    the page comes back with needs_render set: its text has to come from the
+    browser, but its links and emails are already usable.
+    """
+    budget = budget or CrawlBudget()
+    if budget.exhausted():
+        return None
+    html = fetch_html(url, timeout=budget.timeout_s(HTTP_TIMEOUT))
+    if html is None:
+        return None
+    budget.charge_bytes(len(html))
+
+    try:
+        parsed_page = parse_page(html, url, fallback=fallback)
+    except Exception:
+        return None
 
+    if is_blank_or_low_content(parsed_page.text):
+        print(f"  -> Static HTML too thin, escalating to browser: {url}")
+        parsed_page.needs_render = True
+        return parsed_page
+    if not fallback:
+        # Same extraction as get_readable_text, so it can reuse it
+        PAGE_CACHE.set_text(url, parsed_page.text)
+    return parsed_page
+
+
+async def render_home_page(page, url, budget=None):
+    """Loads the home page in the browser, clears cookie banners and returns the HTML."""
+    budget = budget or CrawlBudget()
+    if not budget.start_navigation():
+        raise RuntimeError(f"crawl budget exhausted ({budget.stop_reason})")
+    timeout_s = HOST_HEALTH.timeout_for(url, 15, latency_bound=False)
+    await page.goto(url, timeout=budget.timeout_ms(timeout_s * 1000))
+    await page.wait_for_load_state("domcontentloaded", timeout=budget.timeout_ms(10000))
+
+    if not budget.exhausted():
+        await dismiss_cookies(page)
+    await settle(page, 500, deadline_ms=budget.timeout_ms(READY_DEADLINE_MS))
+    await remove_overlays(page)
+    await settle(page, 1000, deadline_ms=budget.timeout_ms(READY_DEADLINE_MS))
+
+    html = await page.content()
+    budget.charge_bytes(len(html))
+    return html
+
+
+async def render_subpage(context, url, budget=None):
+    """Loads a subpage in its own tab and returns the HTML, or None when over budget."""
+    budget = budget or CrawlBudget()
+    if not budget.start_navigation():
+        return None
+    page = await context.new_page()
+    try:
+        timeout_s = HOST_HEALTH.timeout_for(url, 15, latency_bound=False)
+        await page.goto(url, timeout=budget.timeout_ms(timeout_s * 1000))
+        await page.wait_for_load_state("domcontentloaded", timeout=budget.timeout_ms(10000))
+        await settle(page, 500, deadline_ms=budget.timeout_ms(READY_DEADLINE_MS))
+
+        # Remove cookie banners from subpages too!
+        await remove_overlays(page)
+        await settle(page, 500, deadline_ms=budget.timeout_ms(READY_DEADLINE_MS))
+
+        html = await page.content()
+        budget.charge_bytes(len(html))
+        return html
+    finally:
+        await page.close()
+
+
+async def crawl_site(context_factory, start_url, max_pages=10, budget=None):
+    """
+    Crawls a website, extracts text from relevant pages, and finds the best
+    email address, prioritizing the contact page email, using partial matching
+    on URL path stems. Pages are fetched over plain HTTP first (in worker
+    threads); `context_factory` is awaited for a BrowserContext only when a
+    page has too little static content and needs rendering. Subpages are
+    fetched concurrently in separate tabs and merged afterwards.
+
+    The whole crawl runs within a CrawlBudget; when it runs out, whatever was
+    gathered is returned and "stop_reason" says which limit was hit.
+    """
+    budget = budget or CrawlBudget()
     found_pages = {}
-    all_emails = set() # For deduplication and backup tracking
-    
-    # NEW: Variables for explicit email selection
-    first_email_found = None # The very first email found (the backup)
-    best_email = None        # The prioritized email (from contact page)
+    # Ranks every address found on the site (same domain, contact page, role inbox...)
+    email_ranker = EmailRanker(start_url)
+    context = None
+    context_lock = asyncio.Lock()
+
+    async def browser_context():
+        nonlocal context
+        async with context_lock:
+            if context is None:
+                context = await context_factory()
+        return context
 
-    email_regex = r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}"
-    
     print(f"Scraping website: {start_url}")
-    
-    with sync_playwright() as p:
-        browser = p.firefox.launch(headless=True)
-        page = browser.new_page(user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36")
-        
-        # --- Home Page Fetch and Processing ---
+    if HOST_HEALTH.is_open(start_url):
+        print(f"  -> Skipping {start_url}, host is known to be down")
+        return {"pages": {}, "email": None, "stop_reason": "host_down"}
+
+    # --- Discovery (robots.txt, sitemaps) and static home page, both over plain HTTP ---
+    discovery, home_page = await asyncio.gather(
+        asyncio.to_thread(discover_pages, start_url, budget=budget),
+        asyncio.to_thread(fetch_static_page, start_url, True, budget),
+    )
+    if home_page and not home_page.needs_render:
+        print("  -> Home page fetched over HTTP")
+    elif not discovery.urls:
+        # No sitemap candidates: the rendered home page is the only source of links
         try:
-            page.goto(start_url, timeout=15000)
-            page.wait_for_load_state("domcontentloaded", timeout=10000)
-            
-            dismiss_cookies(page)
-            page.wait_for_timeout(500)
-            remove_overlays(page)
-            page.wait_for_timeout(1000)
-            
-            initial_html = page.content()
+            if budget.exhausted():
+                raise RuntimeError(f"crawl budget exhausted ({budget.stop_reason})")
+            tab = await (await browser_context()).new_page()
+            initial_html = await render_home_page(tab, start_url, budget)
+            rendered_home = parse_page(initial_html, start_url, fallback=True)
+            await asyncio.to_thread(PAGE_CACHE.put, start_url, initial_html, rendered=True)
+            if home_page:
+                rendered_home.add_emails(home_page.email_sources)
+            home_page = rendered_home
         except Exception as e:
-            print(f"Fatal: Could not fetch start_url. Error: {e}")
-            browser.close()
-            return {"pages": {}, "email": None}
-
-        # Extract emails on home
-        emails_on_home = re.findall(email_regex, initial_html)
-        all_emails.update(emails_on_home)
-        
-        # 1. Capture the very first email found on the home page as the default backup
-        if emails_on_home and first_email_found is None:
-            first_email_found = emails_on_home[0]
-            print(f"  -> Backup email found on home page: {first_email_found}")
-        
-        # Process home page (Content extraction logic remains the same)
+            if home_page is None:
+                print(f"Fatal: Could not fetch start_url. Error: {e}")
+                if budget.stop_reason is None:
+                    HOST_HEALTH.record_error(start_url, e)
+                return {"pages": {}, "email": None, "stop_reason": budget.stop_reason or "error"}
+            print(f"  -> Could not render home page, keeping its static HTML: {e}")
+            home_page.needs_render = False  # Not retried below
+    # Otherwise the home page is rendered below, together with the subpages
+
+    # Find candidate links (sitemap pages first, then home page anchors) and pick one URL per stem
+    candidate_links = discovery.urls + (find_candidate_links(home_page, start_url) if home_page else [])
+    # A home page still to be rendered takes one slot of the budget
+    plan = plan_subpages(candidate_links, {"home": None}, max_pages - (home_page is None))
+
+    # The sitemap lists no relevant pages: the home page's own links are still
+    # worth a plain HTTP fetch, but not a browser render
+    render_subpages = not discovery.nothing_relevant
+    if not render_subpages:
+        print("  -> Sitemap lists no relevant pages, subpages are fetched over HTTP only")
+
+    # --- Subpages, fetched concurrently (bounded per site): HTTP tier first, then a browser tab ---
+    subpage_limit = asyncio.Semaphore(SUBPAGE_CONCURRENCY)
+
+    async def render_page(url, static_page, fallback=False):
+        # Browser tier. The static copy is returned when rendering is not possible,
+        # and its emails are kept either way: thin contact pages often have the address
         try:
-            doc = Document(initial_html)
-            soup = BeautifulSoup(doc.summary(), "html.parser")
-            home_page_text = soup.get_text(separator="\n", strip=True)
-            
-            # Simplified direct extraction fallback for brevity
-            if len(home_page_text) < 500:
-                soup_full = BeautifulSoup(initial_html, "html.parser")
-                main_content = soup_full.find('main') or soup_full.find('body')
-                if main_content:
-                    home_page_text = main_content.get_text(separator="\n", strip=True)
-            
-            from_module = globals().get('is_blank_or_low_content')
-            if not from_module or not from_module(home_page_text):
-                found_pages["home"] = {"url": start_url, "text": home_page_text}
-            else:
-                print("  -> Home page content too low, skipping")
+            if budget.exhausted():
+                return static_page
+            page_html = await render_subpage(await browser_context(), url, budget)
+            if page_html is None:
+                return static_page
+            parsed_page = parse_page(page_html, url, fallback=fallback)
+            await asyncio.to_thread(PAGE_CACHE.put, url, page_html, parsed_page.text, rendered=True)
         except Exception as e:
-            print(f"Could not parse homepage: {e}")
-
-        # Find candidate links and prepare URL list
-        full_soup = BeautifulSoup(initial_html, "html.parser")
-        candidate_links = set()
-        for link in full_soup.find_all("a", href=True):
-            href = urljoin(start_url, link["href"])
-            if is_valid_internal_link(start_url, href) and href != start_url:
-                candidate_links.add(href)
-                
-        # --- Subpage Scraping with Partial Matching ---
-        url_list = list(candidate_links)
-        
-        for url in url_list:
-            if len(found_pages) >= max_pages:
-                print("Reached max pages limit")
-                break
-            
-            # Skip if we already found the priority email
-            if best_email is not None:
-                 # We still want to scrape context pages, so we only break if the current page is not a context page
-                 # However, we should prioritize scraping context pages (e.g., 'about') even after finding an email.
-                 # We only check if the current page stem is already scraped.
-                pass 
-
-            matched_stem = None
-            url_lower = url.lower()
-            
-            # Use regex to find a match for any stem in the URL path.
-            for stem in ALL_STEMS:
-                if re.search(f'/{stem}[^/]*', url_lower):
-                    if stem not in found_pages:
-                        matched_stem = stem
-                        break
-            
-            if matched_stem:
-                try:
-                    print(f"  -> Scraping page for stem: '{matched_stem}' at {url}")
-                    page.goto(url, timeout=15000)
-                    page.wait_for_load_state("domcontentloaded", timeout=10000)
-                    page.wait_for_timeout(500)
-                    
-                    remove_overlays(page)
-                    page.wait_for_timeout(500)
-                    
-                    page_html = page.content()
-                    emails_on_page = re.findall(email_regex, page_html)
-                    all_emails.update(emails_on_page)
-
-                    # 2. EMAIL SELECTION LOGIC: Prioritize contact page email
-                    # Check if this page matches a contact stem AND we haven't found a best email yet
-                    if matched_stem in CONTACT_STEMS and emails_on_page and best_email is None:
-                        # Only take the first one found on this dedicated page
-                        best_email = list(emails_on_page)[0]
-                        print(f"  -> Found prioritized contact-specific email: {best_email}")
-
-                    # Content scraping (existing logic)
-                    doc = Document(page_html)
-                    soup = BeautifulSoup(doc.summary(), "html.parser")
-                    content = soup.get_text(separator="\n", strip=True)
-                    
-                    # Store content using the stem as the key
-                    if content and not is_blank_or_low_content(content):
-                        found_pages[matched_stem] = {"url": url, "text": content}
-                        print(f"  -> ✓ Scraped content for stem: {matched_stem}")
-                    else:
-                        print(f"  -> Content too low: {url}")
-                except Exception as e:
-                    print(f"  -> Could not scrape: {url} - {e}")
-                    
-        browser.close()
-        
-    # --- 3. Final Email Selection ---
-    # Use best_email (from contact page) if found, otherwise use first_email_found (backup)
-    final_email = best_email if best_email else first_email_found
-    
+            print(f"  -> Could not render: {url} - {e}")
+            return static_page
+        if static_page:
+            parsed_page.add_emails(static_page.email_sources)
+        return parsed_page
+
+    async def fetch_subpage(url, fallback=False, render=True):
+        async with subpage_limit:
+            try:
+                static_page = await asyncio.to_thread(fetch_static_page, url, fallback, budget)
+            except Exception as e:
+                print(f"  -> Could not scrape: {url} - {e}")
+                static_page = None
+            if (static_page and not static_page.needs_render) or not render:
+                return static_page
+            return await render_page(url, static_page, fallback)
+
+    async def fetch_home():
+        # Still to be rendered only when sitemap candidates let us skip the separate render
+        if home_page and not home_page.needs_render:
+            return home_page
+        async with subpage_limit:
+            return await render_page(start_url, home_page, fallback=True)
+
+    home_page, *fetched = await asyncio.gather(fetch_home(), *(fetch_subpage(url, render=render_subpages) for _, url in plan))
+
+    if home_page is None:
+        print(f"Fatal: Could not fetch start_url: {start_url}")
+    else:
+        email_ranker.add(home_page.email_sources)
+        if home_page.emails:
+            print(f"  -> Emails found on home page: {', '.join(home_page.emails)}")
+        if not is_blank_or_low_content(home_page.text):
+            found_pages["home"] = {"url": start_url, "text": home_page.text}
+        else:
+            print("  -> Home page content too low, skipping")
+
+    # --- Merge results in plan order ---
+    for (matched_stem, url), parsed_page in zip(plan, fetched):
+        if parsed_page is None:
+            continue
+        content = parsed_page.text
+
+        # EMAIL SELECTION: addresses on contact pages weigh more in the ranking
+        email_ranker.add(parsed_page.email_sources, from_contact_page=matched_stem in CONTACT_STEMS)
+
+        # Store content using the stem as the key
+        if content and not is_blank_or_low_content(content):
+            found_pages[matched_stem] = {"url": url, "text": content}
+            print(f"  -> ✓ Scraped content for stem: {matched_stem} ({start_url})")
+        else:
+            print(f"  -> Content too low: {url}")
+
+    # Header, menu, footer etc. are kept once, on the first page that has them
+    found_pages = strip_boilerplate(found_pages)
+
+    # --- Final Email Selection ---
+    final_email = email_ranker.best()
+
     if final_email:
         print(f"[SUCCESS] Found contact email: {final_email}")
-        
-    return {"pages": found_pages, "email": final_email}
+    print(f"  -> Crawl budget used: {budget.stats()}")
+
+    return {"pages": found_pages, "email": final_email, "stop_reason": budget.stop_reason}
 
-def dismiss_cookies(page):
+
+async def crawl_site_pooled(start_url, max_pages=10, budget=None):
     """
-    Attempts to automatically accept cookie banners with conservative targeting.
-    Focus: ONLY click primary accept buttons, avoid settings/details links.
+    crawl_site on the worker's long-lived browser, with a fresh isolated
+    context for the site, opened only once a page actually needs rendering.
     """
+    async with AsyncExitStack() as stack:
+
+        async def context_factory():
+            return await stack.enter_async_context(get_browser_pool().context(user_agent=USER_AGENT))
+
+        return await crawl_site(context_factory, start_url, max_pages=max_pages, budget=budget)
+
+
+def crawl_website(start_url, keywords=None, max_pages=10, budget=None):
+    """
+    Synchronous entry point for crawling a single site; see crawl_site. Runs on
+    the worker's crawler loop, so it shares the long-lived browser with
+    every other crawl of the process.
+    """
+    return run_on_crawler_loop(crawl_site_pooled(start_url, max_pages=max_pages, budget=budget))
+
+
+REMOVE_OVERLAYS_JS = """
+    // Remove common blocking overlays
+    document.querySelectorAll('[class*="modal-backdrop"], [class*="overlay"]').forEach(el => {
+        if (window.getComputedStyle(el).position === 'fixed') {
+            el.remove();
+        }
+    });
     
-    # CONSERVATIVE text matching - only clear "accept" language
-    ACCEPT_KEYWORDS = [
-        # English - be specific
-        "accept all", "accept cookies", "agree and close", "i accept", 
-        "allow all", "accept and continue", "i agree",
-        
-        # Romanian - specific accept phrases (with and without diacritics)
-        "acceptă tot", "accepta tot", "accept tot",
-        "acceptă toate", "accepta toate", "accept toate",
-        "sunt de acord", "de acord",
-        "acceptă cookie", "accepta cookie", "accept cookie",
-        "acceptă și închide", "accepta si inchide", "accept si inchide",
-        "în regulă", "in regula",
-        "permite tot", "permite toate",
-        "continua", "continuă",
-    ]
-    
-    # Known good selectors for major cookie platforms
-    KNOWN_ACCEPT_SELECTORS = [
-        # CookieScript (very common in Romania)
-        '#cookiescript_accept',
-        'button[data-cs-accept-all]',
-        '.cookiescript-accept',
-        
-        # OneTrust
-        '#onetrust-accept-btn-handler',
-        '#accept-recommended-btn-handler',
-        
-        # Cookiebot (popular in EU)
-        '#CybotCookiebotDialogBodyLevelButtonLevelOptinAllowAll',
-        '#CybotCookiebotDialogBodyButtonAccept',
-        '.CybotCookiebotDialogBodyButton',
-        
-        # Common Romanian patterns
-        'button[id*="accepta"]',
-        'button[class*="accepta"]',
-        'button[id*="accept-all"]',
-        'button[class*="accept-all"]',
-        'button[id*="cookie-accept"]',
-        'button[class*="cookie-accept"]',
-        '.cookie-consent-accept',
-        '.btn-accept-cookies',
-        '#accept-cookies',
-        '#acceptCookies',
-        
-        # GDPR generic
-        'button[aria-label*="Accept"]',
-        'button[aria-label*="Acceptă"]',
-        'button[aria-label*="Accepta"]',
-    ]
-    
-    print("  -> Attempting to dismiss cookie banner...")
-    
-    # --- STRATEGY 1: Known Selectors (Most Reliable) ---
-    for selector in KNOWN_ACCEPT_SELECTORS:
-        try:
-            if page.locator(selector).first.is_visible(timeout=2000):
-                page.locator(selector).first.click(timeout=3000)
-                print(f"  -> ✓ Clicked via known selector: {selector}")
-                page.wait_for_timeout(1000)  # Wait for banner to close
-                return True
-        except Exception:
-            continue
-    
-    # --- STRATEGY 2: iFrame Handling (CookieScript often uses iframes) ---
-    try:
-        iframe = page.frame_locator('iframe[id*="cookiescript"]')
-        accept_btn = iframe.locator('#cookiescript_accept')
-        if accept_btn.is_visible(timeout=3000):
-            accept_btn.click()
-            print("  -> ✓ Clicked CookieScript accept in iframe")
-            page.wait_for_timeout(1000)
-            return True
-    except Exception:
-        pass
-    
-    # --- STRATEGY 3: Conservative Text Matching ---
-    for keyword in ACCEPT_KEYWORDS:
-        try:
-            # Look for buttons with exact text match (case insensitive)
-            selector = f'button:has-text("{keyword}")'
-            buttons = page.locator(selector)
-            
-            # Get count of matches
-            count = buttons.count()
-            if count > 0:
-                # Click the first visible one
-                for i in range(count):
-                    try:
-                        btn = buttons.nth(i)
-                        if btn.is_visible(timeout=1000):
-                            btn.click(timeout=2000)
-                            print(f"  -> ✓ Clicked via text: '{keyword}'")
-                            page.wait_for_timeout(1000)
-                            return True
-                    except Exception:
-                        continue
-        except Exception:
-            continue
+    // CRITICAL: Remove cookie banner DOM elements entirely
+    const cookieSelectors = [
+        '[id*="cookie"]',
+        '[class*="cookie"]',
+        '[id*="consent"]', 
+        '[class*="consent"]',
+        '[id*="gdpr"]',
+        '[class*="gdpr"]',
+        '[id*="cookiescript"]',
+        '[class*="cookiescript"]',
+        '[id*="CybotCookiebot"]',
+        '[class*="CybotCookiebot"]',
+        '[id*="onetrust"]',
+        '[class*="onetrust"]'
+    ];
     
-    # --- STRATEGY 4: Nuclear Option (Only if nothing else worked) ---
-    print("  -> No accept button found, trying overlay removal...")
-    try:
-        page.evaluate("""
-            // Only target common cookie banner containers
-            const selectors = [
-                '[id*="cookie"]',
-                '[class*="cookie"]',
-                '[id*="consent"]',
-                '[class*="consent"]',
-                '[id*="gdpr"]',
-                '[class*="gdpr"]'
-            ];
-            
-            selectors.forEach(sel => {
-                document.querySelectorAll(sel).forEach(el => {
-                    // Only hide if it's position fixed/sticky (likely a banner)
-                    const style = window.getComputedStyle(el);
-                    if (style.position === 'fixed' || style.position === 'sticky') {
-                        el.style.setProperty('display', 'none', 'important');
-                    }
-                });
-            });
-            
-            // Re-enable scrolling
-            document.body.style.setProperty('overflow', 'auto', 'important');
-            document.documentElement.style.setProperty('overflow', 'auto', 'important');
-        """)
-        print("  -> ✓ Forced overlay removal")
-        return True
-    except Exception as e:
-        print(f"  -> ✗ Could not remove overlays: {e}")
-    
-    print("  -> No cookie banner found or already dismissed")
-    return False
+    cookieSelectors.forEach(sel => {
+        document.querySelectorAll(sel).forEach(el => {
+            // Remove elements that look like banners/modals
+            const style = window.getComputedStyle(el);
+            if (style.position === 'fixed' || 
+                style.position === 'sticky' || 
+                style.position === 'absolute' ||
+                el.getAttribute('role') === 'dialog' ||
+                el.getAttribute('aria-modal') === 'true') {
+                console.log('Removing cookie element:', el);
+                el.remove();
+            }
+        });
+    });
+"""
+
+
+async def dismiss_cookies(page):
+    """
+    Attempts to automatically accept cookie banners with conservative targeting.
+    Focus: ONLY click primary accept buttons, avoid settings/details links.
+    All strategies run in a single in-page script, see src/scrapers/consent.py.
+    """
+    return await dismiss_consent(page)
 
-        
 
-def remove_overlays(page):
+async def remove_overlays(page):
     """
     Remove any remaining fixed overlays AND cookie banner DOM elements.
     Call this AFTER cookie dismissal.
     """
     try:
-        page.evaluate("""
-            // Remove common blocking overlays
-            document.querySelectorAll('[class*="modal-backdrop"], [class*="overlay"]').forEach(el => {
-                if (window.getComputedStyle(el).position === 'fixed') {
-                    el.remove();
-                }
-            });
-            
-            // CRITICAL: Remove cookie banner DOM elements entirely
-            const cookieSelectors = [
-                '[id*="cookie"]',
-                '[class*="cookie"]',
-                '[id*="consent"]', 
-                '[class*="consent"]',
-                '[id*="gdpr"]',
-                '[class*="gdpr"]',
-                '[id*="cookiescript"]',
-                '[class*="cookiescript"]',
-                '[id*="CybotCookiebot"]',
-                '[class*="CybotCookiebot"]',
-                '[id*="onetrust"]',
-                '[class*="onetrust"]'
-            ];
-            
-            cookieSelectors.forEach(sel => {
-                document.querySelectorAll(sel).forEach(el => {
-                    // Remove elements that look like banners/modals
-                    const style = window.getComputedStyle(el);
-                    if (style.position === 'fixed' || 
-                        style.position === 'sticky' || 
-                        style.position === 'absolute' ||
-                        el.getAttribute('role') === 'dialog' ||
-                        el.getAttribute('aria-modal') === 'true') {
-                        console.log('Removing cookie element:', el);
-                        el.remove();
-                    }
-                });
-            });
-        """)
+        await page.evaluate(REMOVE_OVERLAYS_JS)
         print("  -> ✓ Removed cookie banner DOM elements")
     except Exception as e:
-        print(f"  -> Could not remove overlays: {e}")
\ No newline at end of file
+        print(f"  -> Could not remove overlays: {e}")
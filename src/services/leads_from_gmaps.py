@@ -11,7 +11,8 @@ from src.models import Lead
 import json
 
 from src.scrapers.gmaps_scraper import get_leads_from_Maps
-from src.scrapers.web_scraper import crawl_website
+from src.scrapers.gmaps_tiles import tiled_search
+from src.scrapers.async_crawler import crawl_websites
 from src.utils.prompt_utils import generate_emails
 
 def leads_from_gmaps_service():
@@ -23,9 +24,14 @@ def leads_from_gmaps_service():
     selected_prompt = request.form["prompt_language"]
     additional_instructions = request.form["additional_instructions"]
     max_results = request.form.get("max_results", 5, type=int)
-    
-    if max_results > 50:
-        max_results = 50
+    # Optional: one neighbourhood / sub-area per line, or tiles over the map area
+    areas = [area.strip() for area in request.form.get("areas", "").splitlines() if area.strip()]
+    tiled = bool(areas) or request.form.get("tiled") == "on"
+
+    # A tiled search covers many results feeds, a single search only one
+    max_results_limit = 1000 if tiled else 50
+    if max_results > max_results_limit:
+        max_results = max_results_limit
         
     new_task = Task(
         user_id=current_user.id,
@@ -40,38 +46,46 @@ def leads_from_gmaps_service():
 
     try:
         # Google Maps
-        leads = get_leads_from_Maps(query, max_results=max_results, search_for=1)
+        if tiled:
+            leads = tiled_search(query, max_results=max_results, search_for=1, areas=areas)
+        else:
+            leads = get_leads_from_Maps(query, max_results=max_results, search_for=1)
 
-        # Scrape
-        scrape_results = []
+        # Scrape (all websites concurrently)
+        leads_with_site = []
         for lead in leads:
             if lead.get("link") and lead["link"] != "No Website":
                 print(f"Scraping website for {lead['name']}: {lead['link']}")
-                scraped_data = crawl_website(
-                    lead["link"], keywords=["about", "team", "services", "contact"]
-                )
-
-                if scraped_data and scraped_data.get("pages"):
-                    
-                    combined_text = "\n\n".join(page_data["text"] for page_data in scraped_data["pages"].values())
-                
-                    new_lead = Lead(
-                        task_id=new_task.id,
-                        company_name=lead["name"],
-                        website_url=lead["link"],
-                        contact_email=scraped_data.get("email"),
-                        website_content=combined_text
-                    )
-                    db.session.add(new_lead)
-                    
-                    result_entry = {
-                        "name": lead["name"],
-                        "pages": scraped_data["pages"],
-                        "email": scraped_data.get("email"),
-                    }
-                    scrape_results.append(result_entry)
+                leads_with_site.append(lead)
             else:
                 print(f"Skipping {lead['name']} because no website was found.")
+
+        scraped_list = crawl_websites(
+            [lead["link"] for lead in leads_with_site],
+            keywords=["about", "team", "services", "contact"],
+        )
+
+        scrape_results = []
+        for lead, scraped_data in zip(leads_with_site, scraped_list):
+            if scraped_data and scraped_data.get("pages"):
+                
+                combined_text = "\n\n".join(page_data["text"] for page_data in scraped_data["pages"].values())
+            
+                new_lead = Lead(
+                    task_id=new_task.id,
+                    company_name=lead["name"],
+                    website_url=lead["link"],
+                    contact_email=scraped_data.get("email"),
+                    website_content=combined_text
+                )
+                db.session.add(new_lead)
+                
+                result_entry = {
+                    "name": lead["name"],
+                    "pages": scraped_data["pages"],
+                    "email": scraped_data.get("email"),
+                }
+                scrape_results.append(result_entry)
                 
         db.session.commit()
 
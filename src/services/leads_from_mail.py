@@ -1,5 +1,7 @@
 import io
 import json
+from itertools import chain
+
 import pandas as pd
 from openai import OpenAI
 from flask import request, send_file, redirect, url_for
@@ -11,8 +13,8 @@ from src.models import Lead
 import json
 
 
-from src.scrapers.web_scraper import crawl_website
-from src.utils.mail_utils import get_email_list_from_csv, find_websites_from_emails
+from src.scrapers.async_crawler import crawl_websites
+from src.utils.mail_utils import stream_emails_from_csv, find_websites_from_emails
 from src.utils.prompt_utils import generate_emails
 
 
@@ -39,47 +41,53 @@ def leads_from_mail_service():
         return "No file uploaded.", 400
 
     try:
-        # 2. Read emails from the uploaded CSV
-        emails = get_email_list_from_csv(email_file)
+        # 2. Stream emails from the uploaded CSV (the file is read while domains resolve)
+        emails = stream_emails_from_csv(email_file)
+        first_email = next(emails, None) if emails is not None else None
 
-        if not emails:
+        if first_email is None:
             return "No emails found in the uploaded file.", 400
 
         # 3. Find websites from the emails
-        leads = find_websites_from_emails(emails)
+        leads = find_websites_from_emails(chain([first_email], emails))
 
-        # 4. Scrape websites and generate emails
-        scrape_results = []
+        # 4. Scrape websites (concurrently) and generate emails
+        leads_with_site = []
         for lead in leads:
             # We must use the link from find_websites_from_emails
             if lead.get("link"):
                 print(f"Scraping website for {lead['name']}: {lead['link']}")
-                scraped_data = crawl_website(
-                    lead["link"], keywords=["about", "team", "services", "contact"]
-                )
-
-                if scraped_data and scraped_data.get("pages"):
-                    
-                    combined_text = "\n\n".join(page_data["text"] for page_data in scraped_data["pages"].values())
-                    new_lead = Lead(
-                        task_id=new_task.id,
-                        company_name=lead["name"],
-                        website_url=lead["link"],
-                        contact_email=scraped_data.get("email"),
-                        website_content=combined_text
-                    )
-                    db.session.add(new_lead)
-                    
-                    
-                    result_entry = {
-                        "name": lead["name"],
-                        "pages": scraped_data["pages"],
-                        "email": scraped_data.get("email")
-                        or lead.get("email"),  # Use email from scraper or original
-                    }
-                    scrape_results.append(result_entry)
+                leads_with_site.append(lead)
             else:
                 print(f"Skipping {lead['name']} because no website was found.")
+
+        scraped_list = crawl_websites(
+            [lead["link"] for lead in leads_with_site],
+            keywords=["about", "team", "services", "contact"],
+        )
+
+        scrape_results = []
+        for lead, scraped_data in zip(leads_with_site, scraped_list):
+            if scraped_data and scraped_data.get("pages"):
+                
+                combined_text = "\n\n".join(page_data["text"] for page_data in scraped_data["pages"].values())
+                new_lead = Lead(
+                    task_id=new_task.id,
+                    company_name=lead["name"],
+                    website_url=lead["link"],
+                    contact_email=scraped_data.get("email"),
+                    website_content=combined_text
+                )
+                db.session.add(new_lead)
+                
+                
+                result_entry = {
+                    "name": lead["name"],
+                    "pages": scraped_data["pages"],
+                    "email": scraped_data.get("email")
+                    or lead.get("email"),  # Use email from scraper or original
+                }
+                scrape_results.append(result_entry)
                 
         db.session.commit()
 
@@ -0,0 +1,84 @@
+from functools import lru_cache
+
+from src.scrapers.domains import DOMAIN_CACHE_SIZE, split_host
+
+
+class FreeMailFilter:
+    """
+    Decides whether an email domain belongs to a free-mail provider, from the
+    entries of mail_blacklist.txt. Built once; every check is a few set lookups.
+
+    - Plain entries ("gmail", "yahoo", "k") are provider names. They match the
+      registrable label of the domain exactly, so every country and TLD
+      variant matches (gmail.com, yahoo.co.uk, gmx.de, k.ro), while company
+      domains that merely contain the text (webdesign.ro, mailchimp.com,
+      kaufland.ro) do not.
+    - Dotted entries ("gma.il", "gm.ail") are typos that split the provider
+      name. They match a whole-label suffix of the domain, with or without
+      its public suffix (gma.il, gm.ail.com).
+    """
+
+    def __init__(self, entries):
+        entries = {entry.strip().lower().strip(".") for entry in entries if entry.strip()}
+        self.labels = {entry for entry in entries if "." not in entry}
+        self.dotted = {entry for entry in entries if "." in entry}
+        # Bounded like split_host: the shared filter lives as long as the process
+        self._decide_cached = lru_cache(maxsize=DOMAIN_CACHE_SIZE)(self._decide)
+
+    def _label_suffixes(self, name):
+        labels = name.split(".")
+        return {".".join(labels[i:]) for i in range(len(labels))}
+
+    def is_free(self, domain):
+        return self._decide_cached(domain.strip().lower().rstrip("."))
+
+    def _decide(self, domain):
+        if not domain:
+            return False
+        _, label, suffix = split_host(domain)
+        if not suffix:
+            # Unknown TLD: treat the last label as the suffix
+            name, _, suffix = domain.rpartition(".")
+            label = name.rpartition(".")[2]
+        else:
+            name = domain[: -len(suffix) - 1] if domain.endswith("." + suffix) else domain
+
+        if label in self.labels:
+            return True
+        if self.dotted:
+            return bool(self.dotted & (self._label_suffixes(domain) | self._label_suffixes(name)))
+        return False
+
+    def iter_business_domains(self, emails):
+        """
+        Streaming bulk API: yields (domain, first email using it) for every
+        non-free domain, in input order, as soon as it is first seen. Each
+        distinct domain is classified only once.
+        """
+        seen = set()
+        for email in emails:
+            if not isinstance(email, str):
+                continue
+            local, at, domain = email.strip().rpartition("@")
+            if not at or not local:
+                continue
+            domain = domain.lower()
+            if domain in seen:
+                continue
+            seen.add(domain)
+            if not self.is_free(domain):
+                yield domain, email
+
+    def business_domains(self, emails):
+        """Bulk API: {non-free domain: first email that uses it}, in input order."""
+        return dict(self.iter_business_domains(emails))
+
+    def free_mask(self, emails):
+        """
+        Vectorised variant for a pandas Series of emails: a boolean Series,
+        True where the address uses a free-mail domain. The domain column is
+        split in one pass and only its unique values are classified.
+        """
+        domains = emails.fillna("").astype(str).str.rpartition("@")[2].str.strip().str.lower()
+        decisions = {domain: self.is_free(domain) for domain in domains.unique()}
+        return domains.map(decisions)
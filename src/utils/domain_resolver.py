@@ -0,0 +1,164 @@
+import asyncio
+import os
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+from src.utils.host_health import HOST_HEALTH
+
+
+# Domains resolved at once, and per-step timeouts (seconds)
+RESOLVER_CONCURRENCY = int(os.environ.get("RESOLVER_CONCURRENCY", 100))
+DNS_TIMEOUT_S = float(os.environ.get("DNS_TIMEOUT_S", 3))
+PROBE_TIMEOUT_S = float(os.environ.get("PROBE_TIMEOUT_S", 5))
+
+RESOLVER_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+
+class DnsTimeout(Exception):
+    """No DNS answer in time: the domain may well exist, so it is not known to be dead."""
+
+
+# Servers that refuse HEAD but serve GET fine
+_HEAD_REJECTED = {403, 405, 501}
+
+
+def url_variants(domain, hosts):
+    """The URLs tried for a domain, in order of preference, for the hosts that resolve."""
+    variants = []
+    for scheme in ("https", "http"):
+        for host in (domain, f"www.{domain}"):
+            if host in hosts:
+                variants.append(f"{scheme}://{host}")
+    return variants
+
+
+async def resolving_hosts(domain, timeout=DNS_TIMEOUT_S, executor=None):
+    """
+    Looks up A/AAAA records of the bare domain and its www. host concurrently.
+    Returns the set of hosts that exist; empty for a dead domain. Raises
+    DnsTimeout when neither host resolved and a lookup ran out of time.
+
+    getaddrinfo blocks a thread, so `executor` must have a thread for every
+    lookup running at once; otherwise time spent queued for a thread counts
+    against the timeout.
+    """
+    loop = asyncio.get_running_loop()
+
+    async def lookup(host):
+        try:
+            await asyncio.wait_for(
+                loop.run_in_executor(executor, socket.getaddrinfo, host, 443, 0, socket.SOCK_STREAM), timeout
+            )
+            return host, True
+        except asyncio.TimeoutError:
+            return host, None
+        except (OSError, UnicodeError):
+            return host, False
+
+    answers = await asyncio.gather(lookup(domain), lookup(f"www.{domain}"))
+    hosts = {host for host, exists in answers if exists}
+    if not hosts and any(exists is None for _, exists in answers):
+        raise DnsTimeout(f"DNS lookup timed out for {domain}")
+    return hosts
+
+
+async def probe(client, url):
+    """Returns the final URL if the site answers below 400 (after redirects), else None."""
+    if HOST_HEALTH.is_open(url):
+        return None
+    timeout = HOST_HEALTH.timeout_for(url, PROBE_TIMEOUT_S)
+    started = time.monotonic()
+    try:
+        response = await client.head(url, timeout=timeout)
+        if response.status_code in _HEAD_REJECTED:
+            async with client.stream("GET", url, timeout=timeout) as response:
+                pass  # Only the status is needed, the body is never read
+    except httpx.HTTPError:
+        # Failures of one variant are not the host's fault (http vs https, www vs bare)
+        return None
+
+    HOST_HEALTH.record_success(url, time.monotonic() - started)
+    if response.status_code < 400:
+        return str(response.url)
+    return None
+
+
+async def resolve_domain(client, domain, dns_executor=None):
+    """
+    Finds the website of one domain: DNS pre-check first, then all URL
+    variants of the existing hosts raced concurrently. The first variant that
+    answers wins; the others are cancelled. Raises DnsTimeout if DNS did not
+    answer in time.
+    """
+    if HOST_HEALTH.is_open(domain):
+        return None
+
+    try:
+        hosts = await resolving_hosts(domain, executor=dns_executor)
+    except DnsTimeout:
+        HOST_HEALTH.record_failure(domain, "timeout")
+        raise
+    if not hosts:
+        HOST_HEALTH.record_failure(domain, "dns")
+        return None
+
+    tasks = [asyncio.create_task(probe(client, url)) for url in url_variants(domain, hosts)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            website_url = await next_done
+            if website_url:
+                return website_url
+    finally:
+        for task in tasks:
+            task.cancel()
+    return None
+
+
+async def resolve_websites_async(domains, concurrency=RESOLVER_CONCURRENCY):
+    """
+    Resolves many domains with bounded concurrency. Returns {domain: url or
+    None}; domains whose DNS lookup timed out are left out, so they are
+    neither cached as unreachable nor reported as dead.
+    """
+    limit = asyncio.Semaphore(concurrency)
+    client_limits = httpx.Limits(max_connections=concurrency * 2, max_keepalive_connections=concurrency)
+    # Two lookups (bare and www.) per domain being resolved
+    dns_executor = ThreadPoolExecutor(max_workers=concurrency * 2, thread_name_prefix="dns")
+
+    async with httpx.AsyncClient(
+        follow_redirects=True,
+        limits=client_limits,
+        headers={"User-Agent": RESOLVER_USER_AGENT},
+    ) as client:
+
+        async def run(domain):
+            async with limit:
+                try:
+                    website_url = await resolve_domain(client, domain, dns_executor)
+                except DnsTimeout:
+                    print(f"[INFO] DNS lookup timed out for {domain}, not caching it")
+                    return None
+                except Exception as e:
+                    print(f"[INFO] Could not resolve {domain}: {e}")
+                    website_url = None
+            if website_url:
+                print(f"[SUCCESS] Found valid URL for {domain}: {website_url}")
+            else:
+                print(f"[INFO] Could not resolve a working website for {domain}")
+            return domain, website_url
+
+        try:
+            results = await asyncio.gather(*(run(domain) for domain in domains))
+        finally:
+            # Lookups that timed out may still hold a thread; do not wait for them
+            dns_executor.shutdown(wait=False)
+    return dict(result for result in results if result)
+
+
+def resolve_websites(domains, concurrency=RESOLVER_CONCURRENCY):
+    """Synchronous entry point: {domain: website url or None}, for all `domains`."""
+    if not domains:
+        return {}
+    return asyncio.run(resolve_websites_async(list(domains), concurrency=concurrency))
@@ -0,0 +1,222 @@
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+
+
+# After this many failures in a row the host is skipped for the cooldown period.
+# A DNS failure skips right away, but only the exact hostname that did not
+# resolve: "www.firma.ro" may not exist while "firma.ro" does, and vice versa.
+CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get("CIRCUIT_FAILURE_THRESHOLD", 3))
+CIRCUIT_COOLDOWN_S = float(os.environ.get("CIRCUIT_COOLDOWN_S", 300))
+
+# Expired DNS cooldowns are dropped once this many hostnames are tracked
+_UNRESOLVED_PRUNE_SIZE = 1024
+
+# Adaptive timeouts never go below this (seconds)
+MIN_TIMEOUT_S = 2.0
+
+# Weight of the newest sample in the latency moving average
+LATENCY_EWMA_ALPHA = 0.3
+
+# A host that answered before gets this multiple of its usual latency (plus slack)
+LATENCY_TIMEOUT_FACTOR = 4
+LATENCY_TIMEOUT_SLACK_S = 1.0
+
+
+class HostUnavailable(requests.ConnectionError):
+    """Raised instead of contacting a host whose circuit breaker is open."""
+
+
+def exact_host(url_or_host):
+    host = urlparse(url_or_host).hostname if "//" in url_or_host else url_or_host.split(":", 1)[0]
+    return (host or "").lower()
+
+
+def host_key(url_or_host):
+    """Hosts are tracked without "www.", so both variants share one record."""
+    host = exact_host(url_or_host)
+    return host[4:] if host.startswith("www.") else host
+
+
+_DNS_ERROR_MARKERS = (
+    "name or service not known", "nodename nor servname", "getaddrinfo failed",
+    "no address associated", "name resolution", "nxdomain",
+    "ns_error_unknown_host", "err_name_not_resolved",  # Firefox / Chromium navigation errors
+)
+_CONNECT_ERROR_MARKERS = ("ns_error_connection_refused", "ns_error_net_reset", "err_connection")
+
+
+def classify_error(error):
+    """
+    Maps a requests or Playwright exception to "dns", "timeout", "connect"
+    or "other".
+    """
+    message = str(error).lower()
+    if any(marker in message for marker in _DNS_ERROR_MARKERS):
+        return "dns"
+    if isinstance(error, requests.Timeout) or "timeout" in message:
+        return "timeout"
+    if isinstance(error, requests.ConnectionError) or any(marker in message for marker in _CONNECT_ERROR_MARKERS):
+        return "connect"
+    return "other"
+
+
+class HostStats:
+    def __init__(self):
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.failure_kinds = {}
+        self.latency_s = None  # Moving average of successful requests
+        self.open_until = 0.0
+
+    def as_dict(self):
+        return {
+            "successes": self.successes,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+            "failure_kinds": dict(self.failure_kinds),
+            "latency_s": round(self.latency_s, 3) if self.latency_s is not None else None,
+            "circuit_open": self.open_until > time.monotonic(),
+        }
+
+
+class HostHealthRegistry:
+    """
+    Per-host connection health shared by everything a worker fetches (website
+    lookups, HTTP page fetches, browser navigations):
+
+    - timeout_for() shortens timeouts for hosts that keep failing, and bounds
+      them by the observed latency for hosts that answer (plain HTTP only:
+      the latency of small requests says nothing about full page loads)
+    - is_open() tells whether a host's circuit breaker is open, i.e. the host
+      failed repeatedly and is skipped until the cooldown ends
+    - stats() reports per-host and overall counters
+    """
+
+    def __init__(
+        self,
+        failure_threshold=CIRCUIT_FAILURE_THRESHOLD,
+        cooldown_s=CIRCUIT_COOLDOWN_S,
+        min_timeout_s=MIN_TIMEOUT_S,
+    ):
+        self.failure_threshold = failure_threshold
+        self.cooldown_s = cooldown_s
+        self.min_timeout_s = min_timeout_s
+
+        self._lock = threading.Lock()
+        self._hosts = {}
+        self._unresolved = {}  # Exact hostname -> end of its DNS cooldown
+        self.skipped = 0
+
+    def _stats(self, url):
+        key = host_key(url)
+        stats = self._hosts.get(key)
+        if stats is None:
+            stats = self._hosts[key] = HostStats()
+        return stats
+
+    def is_open(self, url):
+        """True while the host's circuit breaker is open. Counts the skipped call."""
+        with self._lock:
+            now = time.monotonic()
+            stats = self._hosts.get(host_key(url))
+            if (stats is None or stats.open_until <= now) and self._unresolved.get(exact_host(url), 0) <= now:
+                return False
+            self.skipped += 1
+            return True
+
+    def timeout_for(self, url, default_s, latency_bound=True):
+        """
+        Timeout (seconds) to use for the next request to this host. Pass
+        latency_bound=False for browser navigations: they are only shortened
+        for failing hosts.
+        """
+        with self._lock:
+            stats = self._hosts.get(host_key(url))
+            if stats is None:
+                return default_s
+            if stats.consecutive_failures:
+                # Halve the timeout for every failure in a row
+                timeout = default_s / (2 ** stats.consecutive_failures)
+            elif latency_bound and stats.latency_s is not None:
+                timeout = stats.latency_s * LATENCY_TIMEOUT_FACTOR + LATENCY_TIMEOUT_SLACK_S
+            else:
+                timeout = default_s
+        return max(self.min_timeout_s, min(default_s, timeout))
+
+    def record_success(self, url, latency_s):
+        with self._lock:
+            stats = self._stats(url)
+            stats.successes += 1
+            stats.consecutive_failures = 0
+            stats.open_until = 0.0
+            self._unresolved.pop(exact_host(url), None)
+            if stats.latency_s is None:
+                stats.latency_s = latency_s
+            else:
+                stats.latency_s += LATENCY_EWMA_ALPHA * (latency_s - stats.latency_s)
+
+    def record_failure(self, url, kind="other"):
+        with self._lock:
+            stats = self._stats(url)
+            stats.failures += 1
+            stats.failure_kinds[kind] = stats.failure_kinds.get(kind, 0) + 1
+            if kind == "dns":
+                # Says nothing about the www./bare alias sharing the record
+                now = time.monotonic()
+                if len(self._unresolved) >= _UNRESOLVED_PRUNE_SIZE:
+                    self._unresolved = {host: until for host, until in self._unresolved.items() if until > now}
+                self._unresolved[exact_host(url)] = now + self.cooldown_s
+                trip, skipped = True, exact_host(url)
+            else:
+                stats.consecutive_failures += 1
+                trip, skipped = stats.consecutive_failures >= self.failure_threshold, host_key(url)
+                if trip:
+                    stats.open_until = time.monotonic() + self.cooldown_s
+        if trip:
+            print(f"[INFO] Circuit open for {skipped} ({kind}), skipping it for {self.cooldown_s:.0f}s")
+
+    def record_error(self, url, error):
+        """Records a failed request from the exception it raised."""
+        self.record_failure(url, classify_error(error))
+
+    def request(self, method, url, default_timeout_s, session=None, **kwargs):
+        """
+        Sends a request with the host's adaptive timeout and records the
+        outcome. Any HTTP response counts as the host being up. Raises
+        HostUnavailable without sending anything while the circuit is open.
+        """
+        if self.is_open(url):
+            raise HostUnavailable(f"circuit open for {host_key(url)}")
+        requested = kwargs.pop("timeout", None)
+        timeout = self.timeout_for(url, default_timeout_s)
+        if requested:
+            timeout = min(timeout, requested)
+        started = time.monotonic()
+        try:
+            response = (session or requests).request(method, url, timeout=timeout, **kwargs)
+        except requests.RequestException as e:
+            self.record_error(url, e)
+            raise
+        self.record_success(url, time.monotonic() - started)
+        return response
+
+    def stats(self, top=20):
+        with self._lock:
+            hosts = sorted(self._hosts.items(), key=lambda item: -item[1].failures)
+            now = time.monotonic()
+            return {
+                "hosts": len(self._hosts),
+                "open_circuits": sum(1 for _, stats in hosts if stats.open_until > now)
+                + sum(1 for until in self._unresolved.values() if until > now),
+                "skipped_calls": self.skipped,
+                "failing_hosts": {host: stats.as_dict() for host, stats in hosts[:top] if stats.failures},
+            }
+
+
+# Shared registry for this worker process
+HOST_HEALTH = HostHealthRegistry()
@@ -1,14 +1,34 @@
+import csv
+import io
 import os
 import re
-from typing import Dict, List, Set
+from itertools import chain, islice
+from typing import Dict, Iterable, Iterator, List, Set
 
-import pandas as pd
 import requests
 
 from importlib.resources import files
+
+from src.scrapers.email_extractor import EMAIL_RE
+from src.utils.domain_filter import FreeMailFilter
+from src.utils.domain_resolver import resolve_websites
+from src.utils.host_health import HOST_HEALTH
+from src.utils.resolution_cache import lookup_resolutions, store_resolutions
 # Path to the blacklist file
 BLACKLIST_FILE = "mail_blacklist.txt"
 
+# Accepted names of the email column in uploads (case-insensitive)
+EMAIL_COLUMN_NAMES = ["email", "emails", "e-mail"]
+
+# Bytes read from an upload to detect its delimiter
+CSV_SNIFF_BYTES = 64 * 1024
+
+# Domains looked up in the cache and resolved together while the upload is still being read
+RESOLVE_BATCH_SIZE = int(os.environ.get("RESOLVE_BATCH_SIZE", 1000))
+
+# A cell may hold several addresses: "a@firma.ro; b@firma.ro"
+_EMAIL_SEPARATORS_RE = re.compile(r"[;,\s]+")
+
 
 def load_blacklist() -> Set[str]:
     """Loads the blacklist domains from a text file."""
@@ -33,44 +53,24 @@ def load_blacklist() -> Set[str]:
 # Load the blacklist at the module level
 BASE_FREE_DOMAINS = load_blacklist()
 
+# Built once per process; matches by provider label, not by substring
+FREE_MAIL_FILTER = FreeMailFilter(BASE_FREE_DOMAINS)
+
 
 def extract_domains_from_emails(emails: List[str]) -> Dict[str, str]:
     """
     Extracts unique, non-free domains from a list of emails.
     Filters out domains that are from known free providers, including
-    subdomains, country-specific TLDs, and common typos.
+    country-specific TLDs and common typos (see FreeMailFilter).
     """
-    domain_to_email_map = {}
-
-    # Pre-compile the regex pattern for efficiency
-    if not BASE_FREE_DOMAINS:
-        return {}
-
-    free_domains_pattern = "|".join(re.escape(d) for d in BASE_FREE_DOMAINS)
-    free_domains_regex = re.compile(rf".*({free_domains_pattern}).*")
-
-    for email in emails:
-        match = re.search(r"@([^@]+)", email)
-        if not match:
-            continue
-
-        domain = match.group(1).lower()
-
-        # Check if the domain contains any of the base free domains from the blacklist
-        if free_domains_regex.search(domain):
-            continue
-
-        # If it's not a free domain, add it to the map
-        if domain not in domain_to_email_map:
-            domain_to_email_map[domain] = email
-
-    return domain_to_email_map
+    return FREE_MAIL_FILTER.business_domains(emails)
 
 
 def find_website_for_domain(domain: str) -> str | None:
     """
     Tries to find a valid website URL for a single domain using synchronous requests.
-    Checks https/http and www/non-www variations.
+    Checks https/http and www/non-www variations, with the adaptive timeouts and
+    circuit breaker of the shared host-health registry.
     """
     patterns = [
         f"https://{domain}",
@@ -81,7 +81,8 @@ def find_website_for_domain(domain: str) -> str | None:
 
     for url in patterns:
         try:
-            response = requests.head(url, timeout=5, allow_redirects=True)
+            # Skips the remaining variants at once when the domain turns out to be dead
+            response = HOST_HEALTH.request("HEAD", url, 5, allow_redirects=True)
             if response.status_code < 400:
                 print(f"[SUCCESS] Found valid URL for {domain}: {response.url}")
                 return response.url
@@ -92,65 +93,142 @@ def find_website_for_domain(domain: str) -> str | None:
     return None
 
 
-def find_websites_from_emails(emails: List[str]) -> List[Dict[str, str]]:
+def _batches(items: Iterable, size: int) -> Iterator[list]:
+    items = iter(items)
+    while batch := list(islice(items, size)):
+        yield batch
+
+
+def find_websites_from_emails(emails: Iterable[str]) -> List[Dict[str, str]]:
     """
-    Main synchronous function to process a list of emails and find their websites.
-    This is the primary function to be imported into your Flask app.
+    Main synchronous function to process emails and find their websites.
+    This is the primary function to be imported into your Flask app. Domains are
+    resolved concurrently (DNS pre-check, then URL variants raced in parallel);
+    domains resolved recently by any task come from the resolution cache.
+
+    `emails` may be a generator (see stream_emails_from_csv): domains are
+    resolved in batches as they come, so resolution starts before the whole
+    upload has been read.
 
     Args:
-        emails: A list of email addresses.
+        emails: Email addresses, a list or any iterable.
 
     Returns:
         A list of dictionaries in a format compatible with the main app workflow:
         [{'name': domain, 'link': website_url, 'email': original_email}]
     """
-    domain_to_email_map = extract_domains_from_emails(emails)
     results_list = []
+    resolved_any = False
+
+    for batch in _batches(FREE_MAIL_FILTER.iter_business_domains(emails), RESOLVE_BATCH_SIZE):
+        domain_to_email_map = dict(batch)
+        resolved_any = True
+
+        websites = lookup_resolutions(domain_to_email_map.keys())
+        to_resolve = [domain for domain in domain_to_email_map if domain not in websites]
+        print(f"-> {len(websites)} domains resolved from cache, searching websites for {len(to_resolve)}")
 
-    if not domain_to_email_map:
-        return results_list
+        resolved = resolve_websites(to_resolve)
+        store_resolutions(resolved)
+        websites.update(resolved)
 
-    for domain, original_email in domain_to_email_map.items():
-        print(f"-> Searching for website for domain: {domain}")
-        website_url = find_website_for_domain(domain)
+        for domain, original_email in domain_to_email_map.items():
+            website_url = websites.get(domain)
 
-        if website_url:
-            results_list.append(
-                {"name": domain, "link": website_url, "email": original_email}
-            )
+            if website_url:
+                results_list.append(
+                    {"name": domain, "link": website_url, "email": original_email}
+                )
 
+    if resolved_any:
+        print(f"[INFO] Host health: {HOST_HEALTH.stats()}")
     return results_list
 
 
-def get_email_list_from_csv(file_path: str) -> list:
+def normalize_csv_email(value: str) -> Iterator[str]:
+    """Yields the valid, lowercased addresses found in one CSV cell."""
+    for part in _EMAIL_SEPARATORS_RE.split(value):
+        address = part.strip("<>\"'()[]").lower()
+        if address.startswith("mailto:"):
+            address = address[len("mailto:"):]
+        if address and len(address) <= 254 and EMAIL_RE.fullmatch(address):
+            yield address
+
+
+def _open_text(source):
     """
-    Reads a CSV file, finds a column with a case-insensitive match for
-    'Email', and returns its contents as a list.
+    Returns (text stream, close) for a file path, a Flask upload (FileStorage)
+    or an open binary/text file. `close` releases the stream without closing
+    an upload the caller still owns.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        stream = open(source, "r", encoding="utf-8-sig", errors="replace", newline="")
+        return stream, stream.close
+
+    raw = getattr(source, "stream", source)
+    if isinstance(raw, io.TextIOBase):
+        return raw, lambda: None
+    stream = io.TextIOWrapper(raw, encoding="utf-8-sig", errors="replace", newline="")
+    return stream, stream.detach
+
+
+def stream_emails_from_csv(source) -> Iterator[str] | None:
     """
-    # Use pandas to handle the file object directly
+    Streams the addresses of the email column of a CSV upload without loading
+    the file: the delimiter is sniffed from the first 64 KB, the header locates
+    the column, and every row is then reduced to that one cell as it is read.
+
+    Returns a generator of normalized emails, or None when the file is empty or
+    has no column named 'Email' or 'Emails'.
+    """
+    stream, close = _open_text(source)
     try:
-        df = pd.read_csv(file_path)
-    except pd.errors.EmptyDataError:
-        print("Error: The CSV file is empty.")
-        return []
+        sample = stream.read(CSV_SNIFF_BYTES)
+        # Complete the last line so the sample can be chained with the rest of the file
+        sample += stream.readline()
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=",;\t|")
+        except csv.Error:
+            dialect = csv.excel
+
+        sample_lines = io.StringIO(sample)
+        header = next(csv.reader(sample_lines, dialect), None)
     except Exception as e:
+        close()
         print(f"An unexpected error occurred while reading CSV: {e}")
-        return []
-
-    df_columns_lower = [col.lower() for col in df.columns]
-    possible_email_columns = ["email", "emails"]
-    email_column = None
-    for name in possible_email_columns:
-        if name in df_columns_lower:
-            email_column = df.columns[df_columns_lower.index(name)]
-            break
-
-    if email_column:
-        email_list = df[email_column].dropna().tolist()
-        return email_list
-    else:
+        return None
+
+    if not header:
+        close()
+        print("Error: The CSV file is empty.")
+        return None
+
+    header_lower = [column.strip().lower() for column in header]
+    email_index = next((header_lower.index(name) for name in EMAIL_COLUMN_NAMES if name in header_lower), None)
+    if email_index is None:
+        close()
         print("Error: Could not find a column named 'Email' or 'Emails' in the file.")
-        return []
+        return None
+
+    def emails():
+        try:
+            # The rest of the sample, then the rest of the file, line by line
+            for row in csv.reader(chain(sample_lines, stream), dialect):
+                if len(row) > email_index and row[email_index]:
+                    yield from normalize_csv_email(row[email_index])
+        finally:
+            close()
+
+    return emails()
+
+
+def get_email_list_from_csv(file_path) -> list:
+    """
+    Reads a CSV file, finds a column with a case-insensitive match for
+    'Email', and returns its addresses as a list.
+    """
+    emails = stream_emails_from_csv(file_path)
+    return list(emails) if emails is not None else []
 
 
 # BASE_FREE_DOMAINS = load_blacklist()
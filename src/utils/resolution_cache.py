@@ -0,0 +1,96 @@
+import os
+from datetime import datetime, timedelta
+
+from flask import has_app_context
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from src import db
+from src.models import DomainResolution
+
+
+# How long a found website, and an unreachable domain, are trusted
+RESOLUTION_POSITIVE_TTL_DAYS = float(os.environ.get("RESOLUTION_POSITIVE_TTL_DAYS", 30))
+RESOLUTION_NEGATIVE_TTL_DAYS = float(os.environ.get("RESOLUTION_NEGATIVE_TTL_DAYS", 1))
+
+# Max domains per IN (...) query
+_BULK_CHUNK = 500
+
+
+def _chunks(items, size=_BULK_CHUNK):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _is_fresh(row, now):
+    ttl_days = RESOLUTION_POSITIVE_TTL_DAYS if row.website_url else RESOLUTION_NEGATIVE_TTL_DAYS
+    return now - row.resolved_at < timedelta(days=ttl_days)
+
+
+def lookup_resolutions(domains):
+    """
+    Bulk lookup for a whole upload. Returns {domain: website url, or None for
+    a known-unreachable domain} for the domains with a fresh cache entry.
+    Outside of a Flask app context the cache is not available and nothing is returned.
+    """
+    domains = list(dict.fromkeys(domains))
+    if not domains or not has_app_context():
+        return {}
+
+    now = datetime.utcnow()
+    cached = {}
+    try:
+        for chunk in _chunks(domains):
+            for row in DomainResolution.query.filter(DomainResolution.domain.in_(chunk)):
+                if _is_fresh(row, now):
+                    cached[row.domain] = row.website_url
+    except Exception as e:
+        print(f"[INFO] Domain resolution cache unavailable: {e}")
+        db.session.rollback()
+        return {}
+    return cached
+
+
+def _upsert(row, domain, website_url, now):
+    if row is None:
+        db.session.add(DomainResolution(domain=domain, website_url=website_url, resolved_at=now))
+    else:
+        row.website_url = website_url
+        row.resolved_at = now
+
+
+def store_resolutions(results):
+    """
+    Saves {domain: website url or None} results, replacing older entries.
+    Every row is written in its own savepoint, so a row the database rejects
+    is skipped without losing the rest of the batch.
+    """
+    if not results or not has_app_context():
+        return
+
+    now = datetime.utcnow()
+    try:
+        domains = list(results)
+        existing = {}
+        for chunk in _chunks(domains):
+            for row in DomainResolution.query.filter(DomainResolution.domain.in_(chunk)):
+                existing[row.domain] = row
+
+        for domain, website_url in results.items():
+            try:
+                with db.session.begin_nested():
+                    _upsert(existing.get(domain), domain, website_url, now)
+            except IntegrityError:
+                # Another worker stored the same domain meanwhile: update its row instead
+                try:
+                    with db.session.begin_nested():
+                        row = DomainResolution.query.filter_by(domain=domain).first()
+                        _upsert(row, domain, website_url, now)
+                except SQLAlchemyError as e:
+                    print(f"[INFO] Could not cache the resolution of {domain}: {e}")
+            except SQLAlchemyError as e:
+                print(f"[INFO] Could not cache the resolution of {domain}: {e}")
+        db.session.commit()
+    except Exception as e:
+        # The cache is best effort
+        print(f"[INFO] Could not update domain resolution cache: {e}")
+        db.session.rollback()
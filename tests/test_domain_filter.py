@@ -0,0 +1,64 @@
+import pandas as pd
+import pytest
+
+from src.utils.domain_filter import FreeMailFilter
+from src.utils.mail_utils import FREE_MAIL_FILTER, extract_domains_from_emails
+
+
+# Free-mail domains the old substring rule filtered, and that must stay filtered
+FREE_DOMAINS = [
+    "gmail.com", "googlemail.com", "yahoo.co.uk", "ymail.com", "rocketmail.com", "myyahoo.com",
+    "hotmail.com", "outlook.com", "live.com", "windowslive.com", "msn.com", "aol.com", "icloud.com",
+    "protonmail.com", "tutanota.com", "tutamail.com", "zoho.com", "zohomail.com", "gmx.de", "web.de",
+    "mail.com", "mail.ru", "email.ro", "inbox.ru", "list.ru", "bk.ru", "yandex.ru", "fastmail.com",
+    "fastmail.fm", "hushmail.com", "mailbox.org", "rediffmail.com", "freemail.hu", "mail2world.com",
+    "laposte.net", "libero.it", "seznam.cz", "centrum.cz", "wp.pl", "o2.pl", "gazeta.pl",
+    "rdslink.ro", "rdsmail.ro", "rdsoradea.ro", "upcmail.ro", "mymail.ro", "clicknet.ro", "xnet.ro",
+    "rol.ro", "k.ro", "disroot.org",
+]
+
+# Company domains that merely contain a provider name
+BUSINESS_DOMAINS = [
+    "firma.ro", "webdesign.ro", "mailchimp.com", "kaufland.ro", "emailmarketing.ro", "livestream.ro",
+    "gmailhelp.example.ro", "shop.firma.co.uk",
+]
+
+
+@pytest.mark.parametrize("domain", FREE_DOMAINS)
+def test_free_mail_domains_are_filtered(domain):
+    assert FREE_MAIL_FILTER.is_free(domain)
+
+
+@pytest.mark.parametrize("domain", BUSINESS_DOMAINS)
+def test_business_domains_pass(domain):
+    assert not FREE_MAIL_FILTER.is_free(domain)
+
+
+def test_typos_and_subdomains():
+    free_filter = FreeMailFilter(["gmail", "gma.il"])
+
+    assert free_filter.is_free("GMAIL.com.")
+    assert free_filter.is_free("mail.gmail.com")
+    assert free_filter.is_free("gma.il")
+    assert free_filter.is_free("gm.gma.il.com")
+    assert not free_filter.is_free("gmailer.com")
+    assert not free_filter.is_free("")
+
+
+def test_unknown_suffix_uses_last_label():
+    free_filter = FreeMailFilter(["gmail"])
+
+    assert free_filter.is_free("gmail.notatld")
+    assert not free_filter.is_free("firma.notatld")
+
+
+def test_business_domains_keep_first_email_in_order():
+    emails = ["ana@gmail.com", "Office@Firma.ro", "bob@firma.ro", "x@rdsmail.ro", "no-at-sign", None, "sales@shop.ro"]
+
+    assert extract_domains_from_emails(emails) == {"firma.ro": "Office@Firma.ro", "shop.ro": "sales@shop.ro"}
+
+
+def test_free_mask():
+    emails = pd.Series(["a@gmail.com", "b@firma.ro", None, "c@ymail.com"])
+
+    assert FREE_MAIL_FILTER.free_mask(emails).tolist() == [True, False, False, True]
@@ -0,0 +1,81 @@
+import json
+import os
+
+from src.scrapers.gmaps_network import is_search_response, parse_search_payload
+from src.scrapers.gmaps_scraper import merge_leads
+
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def load_payload(name="maps_search_payload.txt"):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def test_parses_places_in_payload_order():
+    leads = parse_search_payload(load_payload())
+
+    assert [lead["name"] for lead in leads] == ["Dental Clinic Marasti", "Zambet Perfect", "Cabinet Dr. Pop"]
+    first = leads[0]
+    assert first["place_id"] == "0x47490c1f6b5a0b0f:0x3c1b5b7f0e2d4a11"
+    assert first["website"] == first["link"] == "https://www.dentalmarasti.ro/"
+    assert first["rating"] == 4.8
+    assert first["reviews"] == 1234
+    assert first["category"] == "Dentist"
+    assert first["address"] == "Strada Fabricii 12, Cluj-Napoca"
+    assert first["phone"] == "0744 123 456"
+    assert first["place_url"].endswith("place_id:ChIJDw9aax8MSUcRESrUDn9bGzw")
+
+
+def test_unwraps_google_redirects_and_joins_address_parts():
+    lead = parse_search_payload(load_payload())[1]
+
+    assert lead["website"] == "https://zambetperfect.ro/contact"
+    assert lead["address"] == "Strada Observatorului 5, Cluj-Napoca"
+
+
+def test_place_without_website():
+    lead = parse_search_payload(load_payload())[2]
+
+    assert lead["website"] is None
+    assert lead["link"] == "No Website"
+    assert lead["rating"] is None
+    assert "0x47490c2b11d3e9a1:0x1f2e3d4c5b6a7980" in lead["place_url"]
+
+
+def test_payload_wrapped_in_d_string():
+    wrapped = json.dumps({"c": 0, "d": load_payload()})
+
+    assert len(parse_search_payload(wrapped)) == 3
+
+
+def test_not_a_search_payload():
+    assert parse_search_payload("<html></html>") == []
+    assert parse_search_payload(")]}'\n[1, 2, 3]") == []
+
+
+def test_is_search_response():
+    assert is_search_response("https://www.google.com/search?tbm=map&authuser=0&hl=en&q=dentist")
+    assert not is_search_response("https://www.google.com/maps/vt?pb=!1m5")
+
+
+def test_merge_fills_missing_fields_from_result_cards():
+    captured = parse_search_payload(load_payload())
+    # As if a field index drifted: the payload lost the website of the first place
+    captured[0] = dict(captured[0], website=None, link="No Website", phone=None)
+    cards = [
+        {"name": "Dental Clinic Marasti", "place_id": captured[0]["place_id"], "website": "https://www.dentalmarasti.ro/",
+         "link": "https://www.dentalmarasti.ro/", "phone": "0744 123 456", "rating": 4.7},
+        {"name": "Only In Feed", "place_id": "0x1:0x2", "website": None, "link": "No Website"},
+    ]
+
+    merged = merge_leads(captured, cards)
+
+    assert [lead["name"] for lead in merged] == [
+        "Dental Clinic Marasti", "Zambet Perfect", "Cabinet Dr. Pop", "Only In Feed"
+    ]
+    assert merged[0]["website"] == merged[0]["link"] == "https://www.dentalmarasti.ro/"
+    assert merged[0]["phone"] == "0744 123 456"
+    # Fields the payload did have are kept
+    assert merged[0]["rating"] == 4.8